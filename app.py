@@ -3,26 +3,112 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from website_analyzer import WebsiteAnalyzer
+from result_cache import AnalysisResultCache
+from jobs import JobQueue
+from tracing import start_metrics_server
+from rate_limit import rate_limits
+from model_routing import parse_routes
 import zipfile
 import io
+import time
 
 # Load environment variables
 load_dotenv()
 
-def create_zip_file():
-    """Create a zip file containing both PDFs"""
+# How long a finished analysis is served again for the same site
+RESULT_TTL_SECONDS = int(os.getenv("RESULT_TTL_SECONDS", 6 * 3600))
+# Analyses running at once on this server; further jobs wait in the queue
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 2))
+# Optional observability: per-analysis JSON traces and a Prometheus /metrics port
+TRACE_DIR = os.getenv("TRACE_DIR")
+METRICS_PORT = os.getenv("METRICS_PORT")
+# Ask the LLM for JSON answers instead of parsing its markdown
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "").lower() in ("1", "true", "yes")
+# Optional JSON overrides of the per-stage model routing, see model_routing.DEFAULT_ROUTES
+MODEL_ROUTES = parse_routes(os.getenv("MODEL_ROUTES")) if os.getenv("MODEL_ROUTES") else None
+# Requests per minute allowed per provider, shared by all sessions of this server
+PROVIDER_RPM = {
+    "gemini": os.getenv("GEMINI_RPM"),
+    "gemini-fast": os.getenv("GEMINI_FAST_RPM"),
+    "tavily": os.getenv("TAVILY_RPM"),
+    "serper": os.getenv("SERPER_RPM"),
+}
+
+@st.cache_resource
+def get_analyzer(tavily_api_key, serper_api_key, google_api_key):
+    """Build the analyzer (and its API clients) once per server process"""
+    for provider, per_minute in PROVIDER_RPM.items():
+        rate_limits.set_rate(provider, float(per_minute) if per_minute else None)
+    return WebsiteAnalyzer(
+        tavily_api_key=tavily_api_key,
+        serper_api_key=serper_api_key,
+        google_api_key=google_api_key,
+        trace_dir=TRACE_DIR,
+        json_output=STRUCTURED_OUTPUT,
+        model_routes=MODEL_ROUTES
+    )
+
+@st.cache_resource
+def get_metrics_server(port):
+    """Start the Prometheus text endpoint once per server process"""
+    return start_metrics_server(int(port))
+
+@st.cache_resource
+def get_job_queue(_analyzer):
+    """Background analysis jobs shared by every session of this server"""
+    return JobQueue(_analyzer, max_concurrent=MAX_CONCURRENT_JOBS)
+
+@st.cache_resource
+def get_result_cache():
+    """Finished analyses shared by every session of this server"""
+    return AnalysisResultCache(ttl=RESULT_TTL_SECONDS)
+
+def create_zip_file(reports):
+    """Create a zip file containing both PDFs from their in-memory bytes"""
     zip_buffer = io.BytesIO()
     
     with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        # Add both PDFs to the zip file if they exist
-        if os.path.exists("company_analysis.pdf"):
-            zip_file.write("company_analysis.pdf")
-        if os.path.exists("use_cases.pdf"):
-            zip_file.write("use_cases.pdf")
+        for filename, pdf_bytes in reports.items():
+            if pdf_bytes:
+                zip_file.writestr(filename, pdf_bytes)
     
     zip_buffer.seek(0)
     return zip_buffer
 
+def render_use_case(use_case):
+    with st.expander(use_case.get("title", "Use Case"), expanded=False):
+        if use_case.get("objective"):
+            st.markdown(f"**Objective:** {use_case['objective']}")
+        if use_case.get("application"):
+            st.markdown(f"**AI Application:** {use_case['application']}")
+        for benefit in use_case.get("benefits", []):
+            st.markdown(f"- {benefit}")
+        if use_case.get("keywords"):
+            st.caption(f"Keywords: {use_case['keywords']}")
+
+def show_job(job, result_cache):
+    """Render the current state of a background analysis job"""
+    st.progress(job.progress(), text=f"Analyzing {job.website_url} ({job.status})")
+    icons = {"pending": "⏳", "running": "🔄", "done": "✅", "failed": "❌"}
+    st.markdown(" · ".join(f"{icons[state]} {stage}" for stage, state in job.stage_states().items()))
+
+    if job.use_cases:
+        st.subheader("Use Cases")
+        for use_case in list(job.use_cases):
+            render_use_case(use_case)
+
+    if job.status == "done":
+        if st.session_state.get("cached_job_id") != job.id:
+            result_cache.put(job.website_url, {"reports": job.result, "use_cases": list(job.use_cases)})
+            st.session_state.cached_job_id = job.id
+        st.success("Reports generated successfully: " + " and ".join(job.result))
+        st.session_state.reports = job.result
+        st.session_state.analysis_complete = True
+    elif job.status == "failed":
+        st.error(f"An error occurred: {job.error}")
+    elif job.status == "cancelled":
+        st.warning("Analysis cancelled")
+
 def main():
     st.title("Website AI Analysis Tool")
     st.write("Analyze websites and generate AI use cases with detailed reports")
@@ -36,34 +122,55 @@ def main():
         st.error("Please set up all required API keys in the .env file")
         return
 
-    # Create analyzer instance
-    analyzer = WebsiteAnalyzer(
-        tavily_api_key=tavily_api_key,
-        serper_api_key=serper_api_key,
-        google_api_key=google_api_key
-    )
+    # Shared analyzer instance; reruns of the script reuse it
+    analyzer = get_analyzer(tavily_api_key, serper_api_key, google_api_key)
+    result_cache = get_result_cache()
+    job_queue = get_job_queue(analyzer)
+    if METRICS_PORT:
+        get_metrics_server(METRICS_PORT)
 
     # Store the analysis state
     if 'analysis_complete' not in st.session_state:
         st.session_state.analysis_complete = False
+    if 'reports' not in st.session_state:
+        st.session_state.reports = {}
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = None
 
     # Input field for website URL
     website_url = st.text_input("Enter website URL:",)
+    refresh = st.checkbox("Ignore cached results and re-analyze")
+    compare = st.checkbox("Also crawl competitors' websites for a side-by-side comparison")
 
     if st.button("Analyze Website"):
-        with st.spinner("Analyzing website and generating reports..."):
-            try:
-                result = analyzer.analyze_and_generate_pdfs(website_url)
-                st.success(result)
-                st.session_state.analysis_complete = True
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
-                st.session_state.analysis_complete = False
+        cached = None if refresh else result_cache.get(website_url)
+        if cached is not None and compare and "comparison.pdf" not in cached["reports"]:
+            cached = None
+        if cached is not None:
+            minutes = int((result_cache.age(website_url) or 0) // 60)
+            st.info(f"Showing the analysis from {minutes} minutes ago")
+            st.subheader("Use Cases")
+            for use_case in cached["use_cases"]:
+                render_use_case(use_case)
+            st.session_state.reports = cached["reports"]
+            st.session_state.analysis_complete = True
+            st.session_state.job_id = None
+        else:
+            job = job_queue.submit(website_url, refresh=refresh, compare=compare)
+            st.session_state.job_id = job.id
+            st.session_state.reports = {}
+            st.session_state.analysis_complete = False
+
+    job = job_queue.get(st.session_state.job_id) if st.session_state.job_id else None
+    if job is not None:
+        if not job.finished and st.button("Cancel analysis"):
+            job_queue.cancel(job.id)
+        show_job(job, result_cache)
 
     # Single download button for both PDFs
     if st.session_state.analysis_complete:
-        if os.path.exists("company_analysis.pdf") and os.path.exists("use_cases.pdf"):
-            zip_buffer = create_zip_file()
+        if all(st.session_state.reports.values()):
+            zip_buffer = create_zip_file(st.session_state.reports)
             st.download_button(
                 label="Download All Reports",
                 data=zip_buffer,
@@ -71,5 +178,10 @@ def main():
                 mime="application/zip",
             )
 
+    # Poll the background job until it finishes
+    if job is not None and not job.finished:
+        time.sleep(1)
+        st.rerun()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,166 @@
+# batch.py
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from model_routing import parse_routes
+from rate_limit import RetryPolicy, rate_limits
+from tracing import metrics
+from website_analyzer import WebsiteAnalyzer
+
+
+def read_urls(path):
+    """Read one URL per line, skipping blanks, comments and repeats"""
+    urls = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith("#"):
+                continue
+            if "://" not in url:
+                url = f"https://{url}"
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+    return urls
+
+
+def load_finished(path):
+    """URLs that already have a successful result in the checkpoint file"""
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a partial last line behind
+                continue
+            if record.get("status") == "ok":
+                finished.add(record["url"])
+    return finished
+
+
+class JsonlWriter:
+    """Appends records and fsyncs each one so a crash never loses finished work"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def analyze_one(analyzer, url, incremental=True):
+    started = time.perf_counter()
+    record = {"url": url}
+    try:
+        record["result"] = analyzer.analyze_website(url, incremental=incremental)
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["duration_seconds"] = round(time.perf_counter() - started, 3)
+    record["finished_at"] = datetime.now(timezone.utc).isoformat()
+    return record
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze many websites without the Streamlit UI")
+    parser.add_argument("input", help="File with one website URL or domain per line")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of analyses run at the same time")
+    parser.add_argument("--gemini-rpm", type=float, help="Shared Gemini requests per minute (strong tier)")
+    parser.add_argument("--gemini-fast-rpm", type=float, help="Shared requests per minute for the fast Gemini tier")
+    parser.add_argument("--model-routes", type=parse_routes,
+                        help='JSON per-stage model routing, e.g. \'{"use_cases": {"tier": "fast", "timeout": 90}}\'')
+    parser.add_argument("--tavily-rpm", type=float, help="Shared Tavily requests per minute")
+    parser.add_argument("--serper-rpm", type=float, help="Shared Serper requests per minute")
+    parser.add_argument("--max-attempts", type=int, default=4, help="Tries per external API call on 429s, timeouts and 5xx errors")
+    parser.add_argument("--max-retry-delay", type=float, default=30.0, help="Longest wait between tries; a longer Retry-After fails the call")
+    parser.add_argument("--structured-output", action="store_true", help="Ask the LLM for JSON answers instead of markdown")
+    parser.add_argument("--trace-dir", help="Write a JSON trace of every analysis into this directory")
+    parser.add_argument("--metrics-file", help="Keep Prometheus-style latency histograms and counters in this file")
+    parser.add_argument("--no-incremental", action="store_true", help="Rerun every stage even if its inputs match the last analysis")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run domains already present in the output file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_dotenv()
+
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    serper_api_key = os.getenv("SERPER_API_KEY")
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not tavily_api_key or not serper_api_key or not google_api_key:
+        print("Please set up all required API keys in the .env file", file=sys.stderr)
+        return 1
+
+    rate_limits.set_rate("gemini", args.gemini_rpm)
+    rate_limits.set_rate("gemini-fast", args.gemini_fast_rpm)
+    rate_limits.set_rate("tavily", args.tavily_rpm)
+    rate_limits.set_rate("serper", args.serper_rpm)
+    rate_limits.retry = RetryPolicy(attempts=args.max_attempts, max_delay=args.max_retry_delay)
+
+    urls = read_urls(args.input)
+    finished = set() if args.no_resume else load_finished(args.output)
+    pending = [url for url in urls if url not in finished]
+    print(f"{len(urls)} URLs, {len(urls) - len(pending)} already done, {len(pending)} to analyze")
+
+    # One analyzer is shared by all workers so they share connection pools and caches
+    analyzer = WebsiteAnalyzer(
+        tavily_api_key=tavily_api_key,
+        serper_api_key=serper_api_key,
+        google_api_key=google_api_key,
+        trace_dir=args.trace_dir,
+        json_output=args.structured_output,
+        model_routes=args.model_routes
+    )
+    writer = JsonlWriter(args.output)
+    done = failed = 0
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    try:
+        futures = {pool.submit(analyze_one, analyzer, url, not args.no_incremental): url for url in pending}
+        for future in as_completed(futures):
+            record = future.result()
+            writer.write(record)
+            if args.metrics_file:
+                metrics.write_prometheus(args.metrics_file)
+            done += 1
+            failed += record["status"] != "ok"
+            print(f"[{done}/{len(pending)}] {record['status']:5} {record['url']} ({record['duration_seconds']}s)")
+    except KeyboardInterrupt:
+        print("Interrupted; finished results are saved and will be skipped on the next run", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return 130
+    finally:
+        writer.close()
+    pool.shutdown(wait=True)
+
+    print(f"Done: {done - failed} succeeded, {failed} failed")
+    for (stage, model), stats in sorted(analyzer.models.stats().items()):
+        print(f"  {stage:20} {model:18} {stats['calls']:4} calls, {stats['timeouts']} timeouts, "
+              f"{stats['failures']} failures, {stats['seconds'] / stats['calls']:.2f}s avg, est. ${stats['cost_usd']:.4f}")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# benchmarks/bench_import.py
+# Cold-start profile: imports each entry-point module in a fresh interpreter
+# under -X importtime and reports where the time goes.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "import_baseline.json")
+
+MODULES = ("app", "website_analyzer", "batch")
+# Loaded on first use only; importing them at start-up is a regression
+LAZY_PACKAGES = ("langchain", "langchain_google_genai", "google.generativeai", "tavily", "reportlab", "numpy")
+# Streamlit itself pulls in pandas and numpy
+EAGER_ALLOWED = {"app": ("numpy",)}
+
+
+def profile_import(module):
+    """Import ``module`` in a new interpreter; return (total seconds, {module: (self_us, cumulative_us)})."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings[module][1] / 1e6, timings
+
+
+def by_package(timings):
+    totals = defaultdict(int)
+    for name, (self_us, _) in timings.items():
+        totals[name.split(".")[0]] += self_us
+    return sorted(((package, us / 1e6) for package, us in totals.items()), key=lambda item: -item[1])
+
+
+def eager_lazy_imports(module, timings):
+    allowed = EAGER_ALLOWED.get(module, ())
+    return sorted(
+        package for package in LAZY_PACKAGES
+        if package not in allowed and any(name == package or name.startswith(f"{package}.") for name in timings)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profile of the app and analyzer entry points")
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="Packages to list per module")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a regression is reported")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failures = []
+    for module in args.modules:
+        runs = [profile_import(module) for _ in range(args.repeat)]
+        seconds = statistics.median(total for total, _ in runs)
+        timings = runs[-1][1]
+        eager = eager_lazy_imports(module, timings)
+        results[module] = {
+            "median_seconds": round(seconds, 4),
+            "packages": [[package, round(s, 4)] for package, s in by_package(timings)[:args.top]],
+            "eager_lazy_packages": eager,
+        }
+        print(f"{module}: {seconds * 1000:.0f} ms")
+        for package, package_seconds in by_package(timings)[:args.top]:
+            print(f"  {package:28} {package_seconds * 1000:8.1f} ms")
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at start-up")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, "import-latest.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for module, current in results.items():
+            before = baseline.get(module, {}).get("median_seconds")
+            if before and current["median_seconds"] > before * (1 + args.tolerance):
+                failures.append(f"{module}: {before * 1000:.0f} ms -> {current['median_seconds'] * 1000:.0f} ms")
+
+    if failures:
+        print("Cold-start regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# benchmarks/bench_parsers.py
+# Micro-benchmarks of the markdown TextCleaner heuristics against the
+# structured-output JSON parsers and their precompiled markdown fallback.
+import argparse
+import json
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fakes import fake_use_cases, fake_use_cases_json  # noqa: E402
+
+from structured_output import (  # noqa: E402
+    JSONUseCaseStreamParser, parse_company_analysis, parse_company_analysis_markdown, parse_competitor_analysis,
+    parse_competitor_analysis_markdown, parse_use_cases, parse_use_cases_markdown, use_case_keywords
+)
+from website_analyzer import TextCleaner, UseCaseStreamParser, WebsiteAnalyzer  # noqa: E402
+
+
+def company_analysis(items):
+    sections = ["Key offerings", "Strategic focus areas", "Vision and goals", "Industry and market segment"]
+    markdown = []
+    for section in sections:
+        markdown.append(f"**{section}:**")
+        markdown.extend(f"- {section} detail {i}: cloud analytics for enterprise customers" for i in range(items))
+    structured = {
+        key: [f"{section} detail {i}: cloud analytics for enterprise customers" for i in range(items)]
+        for key, section in zip(("offerings", "focus_areas", "vision_goals", "industry"), sections)
+    }
+    return "\n".join(markdown), json.dumps(structured, indent=2)
+
+
+def competitor_analysis(companies, items):
+    markdown = ["**Market trends in AI:**"]
+    markdown.extend(f"- Trend {i}: rapid adoption of generative AI" for i in range(items))
+    markdown.append("**Drivers and challenges:**")
+    markdown.extend(f"- Driver {i}: data quality and governance" for i in range(items))
+    competitors = []
+    for c in range(companies):
+        markdown.append(f"Company {c}:")
+        details = [f"Product line {i} with analytics and consulting" for i in range(items)]
+        markdown.extend(f"- {detail}" for detail in details)
+        competitors.append({"name": f"Company {c}", "details": details})
+    structured = {
+        "market_trends": [f"Trend {i}: rapid adoption of generative AI" for i in range(items)],
+        "drivers_challenges": [f"Driver {i}: data quality and governance" for i in range(items)],
+        "competitors": competitors,
+    }
+    return "\n".join(markdown), json.dumps(structured, indent=2)
+
+
+def stream(parser, text, chunk_chars=40):
+    parsed = []
+    for start in range(0, len(text), chunk_chars):
+        parsed.extend(parser.feed(text[start:start + chunk_chars]))
+    parsed.extend(parser.finish())
+    return parsed
+
+
+def run(cases, number, repeat):
+    rows = []
+    for group, name, size, func in cases:
+        best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        rows.append({"group": group, "parser": name, "input_bytes": size, "seconds": best})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the markdown and structured-output parsers on large answers")
+    parser.add_argument("--use-cases", type=int, default=500, help="Use cases in the generated answer")
+    parser.add_argument("--items", type=int, default=200, help="Bullets per analysis section")
+    parser.add_argument("--competitors", type=int, default=50)
+    parser.add_argument("--number", type=int, default=5, help="Calls per timing")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per parser; the best is reported")
+    parser.add_argument("--json", help="Also write the timings to this file")
+    args = parser.parse_args(argv)
+
+    use_cases_md = fake_use_cases(args.use_cases)
+    use_cases_json = fake_use_cases_json(args.use_cases)
+    company_md, company_json = company_analysis(args.items)
+    competitor_md, competitor_json = competitor_analysis(args.competitors, args.items)
+    markdown_analyzer = SimpleNamespace(json_output=False)
+
+    cases = [
+        ("use cases", "TextCleaner.clean_markdown", len(use_cases_md), lambda: TextCleaner.clean_markdown(use_cases_md)),
+        ("use cases", "parse_use_cases_markdown", len(use_cases_md), lambda: parse_use_cases_markdown(use_cases_md)),
+        ("use cases", "parse_use_cases (JSON)", len(use_cases_json), lambda: parse_use_cases(use_cases_json)),
+        ("streamed use cases", "UseCaseStreamParser", len(use_cases_md), lambda: stream(UseCaseStreamParser(), use_cases_md)),
+        ("streamed use cases", "JSONUseCaseStreamParser", len(use_cases_json), lambda: stream(JSONUseCaseStreamParser(), use_cases_json)),
+        ("use case keywords", "WebsiteAnalyzer.extract_use_cases", len(use_cases_md),
+         lambda: WebsiteAnalyzer.extract_use_cases(markdown_analyzer, use_cases_md)),
+        ("use case keywords", "use_case_keywords (JSON)", len(use_cases_json),
+         lambda: use_case_keywords(parse_use_cases(use_cases_json))),
+        ("company analysis", "TextCleaner.clean_company_analysis", len(company_md), lambda: TextCleaner.clean_company_analysis(company_md)),
+        ("company analysis", "parse_company_analysis_markdown", len(company_md), lambda: parse_company_analysis_markdown(company_md)),
+        ("company analysis", "parse_company_analysis (JSON)", len(company_json), lambda: parse_company_analysis(company_json)),
+        ("competitor analysis", "TextCleaner.clean_competitor_analysis", len(competitor_md),
+         lambda: TextCleaner.clean_competitor_analysis(competitor_md)),
+        ("competitor analysis", "parse_competitor_analysis_markdown", len(competitor_md),
+         lambda: parse_competitor_analysis_markdown(competitor_md)),
+        ("competitor analysis", "parse_competitor_analysis (JSON)", len(competitor_json),
+         lambda: parse_competitor_analysis(competitor_json)),
+    ]
+    rows = run(cases, args.number, args.repeat)
+
+    baseline = {}
+    print(f"{'parser':42} {'input':>10} {'time':>10} {'vs first':>9}")
+    for row in rows:
+        first = baseline.setdefault(row["group"], row["seconds"])
+        row["relative"] = row["seconds"] / first
+        print(f"{row['parser']:42} {row['input_bytes'] / 1024:8.0f}KB {row['seconds'] * 1000:8.2f}ms {row['relative']:8.2f}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# benchmarks/fakes.py
+# Offline stand-ins for the website, Tavily, Serper and Gemini, with
+# configurable latency, so the pipeline can be benchmarked without API quota.
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER = (
+    "Our platform helps enterprises in retail, finance and healthcare modernize their operations. "
+    "We offer cloud products, analytics services and consulting for digital transformation. "
+)
+
+
+class FakeWebsite:
+    """Serves a landing page with ``footer_links`` footer links, each a page of ``page_paragraphs`` paragraphs."""
+
+    def __init__(self, footer_links=40, page_paragraphs=30, page_latency=0.05, host="127.0.0.1"):
+        self.host = host
+        self.footer_links = footer_links
+        self.page_paragraphs = page_paragraphs
+        self.page_latency = page_latency
+        self.requests = 0
+        self.edits = {}  # page index -> extra paragraph, to simulate a changed page
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _landing_page(self):
+        links = "".join(f'<a href="/page/{i}">Page {i}</a>' for i in range(self.footer_links))
+        # Real footers also carry fragments, mail links and social profiles
+        links += '<a href="/page/0#top">Top</a><a href="mailto:info@example.com">Mail</a>'
+        links += '<a href="https://twitter.com/example">Twitter</a><a href="/brochure.pdf">Brochure</a>'
+        return f"<html><body><nav>Home Products About</nav><main>Welcome</main><footer>{links}</footer></body></html>"
+
+    def _page(self, path):
+        paragraphs = "".join(f"<p>{path} section {i}. {FILLER}</p>" for i in range(self.page_paragraphs))
+        index = path.rsplit("/", 1)[-1]
+        if index.isdigit() and int(index) in self.edits:
+            paragraphs += f"<p>{self.edits[int(index)]}</p>"
+        return (
+            "<html><head><style>body{}</style><script>var tracking = 1;</script></head><body>"
+            "<nav>Home Products About Careers Contact</nav>"
+            '<div class="cookie-banner">We use cookies to improve your experience.</div>'
+            f"<main><h1>{path}</h1>{paragraphs}</main>"
+            "<footer>Copyright Example Inc. All rights reserved.</footer></body></html>"
+        )
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                if self.path == "/":
+                    body, content_type = site._landing_page(), "text/html"
+                elif self.path.endswith(".pdf"):
+                    body, content_type = "%PDF-1.4 fake", "application/pdf"
+                else:
+                    time.sleep(site.page_latency)
+                    body, content_type = site._page(self.path), "text/html; charset=utf-8"
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self._server.server_address[1]}/"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+USE_CASE_TOPICS = [
+    ("Customer Support Chatbot", "chatbot, customer support, nlp"),
+    ("Demand Forecasting", "forecasting, time series, retail demand"),
+    ("Fraud Detection", "fraud detection, anomaly detection, transactions"),
+    ("Document Summarization", "summarization, llm, documents"),
+    ("Product Recommendations", "recommendation systems, personalization, ecommerce"),
+    ("Customer Support Assistant", "customer support, chatbot, nlp"),
+    ("Churn Prediction", "churn prediction, classification, customers"),
+    ("Contract Review", "legal documents, llm, summarization"),
+]
+
+
+def fake_use_cases(count):
+    blocks = []
+    for i in range(count):
+        title, keywords = USE_CASE_TOPICS[i % len(USE_CASE_TOPICS)]
+        blocks.append(
+            f"**Use Case {i + 1}: {title}**\n"
+            f"Objective: Improve {title.lower()} outcomes across the business.\n"
+            f"AI Application: Apply GenAI and ML models to {title.lower()}.\n"
+            "Cross-Functional Benefits:\n"
+            "- Operations: faster turnaround\n"
+            "- Finance: lower cost\n"
+            f"**Keywords:** {keywords}\n"
+        )
+    return "\n".join(blocks)
+
+
+def fake_use_cases_json(count):
+    """The same use cases as ``fake_use_cases``, as the structured-output JSON array."""
+    use_cases = []
+    for i in range(count):
+        title, keywords = USE_CASE_TOPICS[i % len(USE_CASE_TOPICS)]
+        use_cases.append({
+            "title": title,
+            "objective": f"Improve {title.lower()} outcomes across the business.",
+            "application": f"Apply GenAI and ML models to {title.lower()}.",
+            "benefits": ["Operations: faster turnaround", "Finance: lower cost"],
+            "keywords": [keyword.strip() for keyword in keywords.split(",")],
+        })
+    return json.dumps(use_cases, indent=2)
+
+
+COMPANY_ANALYSIS = """**Key offerings:**
+- Cloud platform
+- Analytics services
+**Strategic focus areas:**
+- Enterprise AI
+**Vision and goals:**
+Become the leading data platform.
+**Industry and market segment:**
+Enterprise software.
+"""
+
+COMPETITOR_ANALYSIS = """**Market trends in AI:**
+- Rapid GenAI adoption
+**Drivers and challenges:**
+- Data quality
+**Forecast and growth:**
+- 30% CAGR
+Acme Corp:
+- Cloud analytics
+Globex:
+- Consulting
+"""
+
+COMPANY_ANALYSIS_JSON = json.dumps({
+    "offerings": ["Cloud platform", "Analytics services"],
+    "focus_areas": ["Enterprise AI"],
+    "vision_goals": ["Become the leading data platform."],
+    "industry": ["Enterprise software."],
+}, indent=2)
+
+COMPETITOR_ANALYSIS_JSON = json.dumps({
+    "market_trends": ["Rapid GenAI adoption"],
+    "drivers_challenges": ["Data quality"],
+    "forecasts": ["30% CAGR"],
+    "industry_reports": [],
+    "competitors": [
+        {"name": "Acme Corp", "details": ["Cloud analytics"]},
+        {"name": "Globex", "details": ["Consulting"]},
+    ],
+}, indent=2)
+
+
+class FakeLLM:
+    """Chat model stand-in: fixed latency per call plus a per-output-token cost."""
+
+    def __init__(self, latency=1.0, seconds_per_token=0.002, use_case_count=8, chunk_chars=40):
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+        self.use_case_count = use_case_count
+        self.chunk_chars = chunk_chars
+        self.model = "fake-gemini"
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        prompt = str(prompt)
+        structured = "Respond with JSON only" in prompt
+        if "propose relevant use cases" in prompt:
+            return (fake_use_cases_json if structured else fake_use_cases)(self.use_case_count)
+        if "List down company-wise" in prompt:
+            return COMPETITOR_ANALYSIS_JSON if structured else COMPETITOR_ANALYSIS
+        return COMPANY_ANALYSIS_JSON if structured else COMPANY_ANALYSIS
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        answer = self._answer(prompt)
+        time.sleep(self.latency + len(answer) / 4 * self.seconds_per_token)
+        return FakeMessage(answer)
+
+    def stream(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        answer = self._answer(prompt)
+        time.sleep(self.latency)
+        for start in range(0, len(answer), self.chunk_chars):
+            chunk = answer[start:start + self.chunk_chars]
+            time.sleep(len(chunk) / 4 * self.seconds_per_token)
+            yield FakeMessage(chunk)
+
+
+class FakeTavily:
+    """Answers competitor lookups; ``competitor_sites`` are returned when website domains are asked for."""
+
+    def __init__(self, latency=1.5, competitor_sites=()):
+        self.latency = latency
+        self.competitor_sites = list(competitor_sites)
+        self.calls = 0
+
+    def qna_search(self, query):
+        self.calls += 1
+        time.sleep(self.latency)
+        if "website domains" in query:
+            return repr(self.competitor_sites)
+        return "['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli']"
+
+
+class FakeSerperResponse:
+    def __init__(self, query):
+        slug = "-".join(query.lower().split()[-3:])
+        self.content = json.dumps({"organic": [
+            {"link": f"https://github.com/example/{slug}"},
+            {"link": f"https://www.kaggle.com/datasets/example/{slug}"},
+            {"link": f"https://huggingface.co/datasets/example/{slug}"},
+        ]}).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSerper:
+    """Replaces ``DatasetLinkSearcher.session.post``."""
+
+    def __init__(self, latency=0.8):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, headers=None, data=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return FakeSerperResponse(json.loads(data)["q"])
@@ -0,0 +1,260 @@
+# benchmarks/run_benchmarks.py
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fakes import FakeLLM, FakeSerper, FakeTavily, FakeWebsite  # noqa: E402
+
+from competitors import competitor_discovery  # noqa: E402
+from llm_cache import CachedLLM, SQLiteLLMCache  # noqa: E402
+from stage_store import StageStore  # noqa: E402
+from tracing import TracedLLM  # noqa: E402
+from website_analyzer import WebsiteAnalyzer  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+ENTRY_POINTS = ("analyze_and_generate_pdfs", "analyze_website", "compare_websites")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Stubs:
+    def __init__(self, args, competitor_sites=()):
+        self.llm = FakeLLM(latency=args.llm_latency, seconds_per_token=args.llm_seconds_per_token,
+                           use_case_count=args.use_cases)
+        self.tavily = FakeTavily(latency=args.tavily_latency, competitor_sites=competitor_sites)
+        self.serper = FakeSerper(latency=args.serper_latency)
+
+
+def build_analyzer(stubs, args, cache_dir):
+    analyzer = WebsiteAnalyzer(
+        tavily_api_key="benchmark",
+        serper_api_key="benchmark",
+        google_api_key="benchmark",
+        http_cache_path=os.path.join(cache_dir, "http.sqlite") if args.with_caches else None,
+        llm_cache_path=None,
+        stage_store_path=os.path.join(cache_dir, "stages.sqlite") if args.with_caches else None,
+        results_store_path=os.path.join(cache_dir, "results.sqlite") if args.with_caches else None,
+        render_processes=args.render_processes,
+        json_output=args.structured_output
+    )
+    llm = TracedLLM(stubs.llm, provider="fake")
+    if args.with_caches:
+        llm = CachedLLM(llm, SQLiteLLMCache(os.path.join(cache_dir, "llm.sqlite")), "fake")
+    # Every model tier is answered by the same stand-in
+    analyzer.models.llms = {tier: llm for tier in analyzer.models.llms}
+    analyzer.tavily_client = stubs.tavily
+    analyzer.dataset_searcher.session.post = stubs.serper.post
+    return analyzer
+
+
+def reset_caches(args):
+    # Without --with-caches every analysis pays for every external call
+    if not args.with_caches:
+        competitor_discovery.clear()
+
+
+def run_once(analyzer, entry_point, url):
+    started = time.perf_counter()
+    getattr(analyzer, entry_point)(url)
+    return time.perf_counter() - started
+
+
+def bench_latency(analyzer, entry_point, url, args):
+    latencies = []
+    for _ in range(args.iterations):
+        reset_caches(args)
+        latencies.append(run_once(analyzer, entry_point, url))
+    return {
+        "iterations": len(latencies),
+        "p50_seconds": round(percentile(latencies, 50), 4),
+        "p95_seconds": round(percentile(latencies, 95), 4),
+        "mean_seconds": round(statistics.mean(latencies), 4),
+    }
+
+
+def bench_throughput(analyzer, entry_point, url, concurrency, args):
+    total = concurrency * args.throughput_rounds
+    reset_caches(args)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: run_once(analyzer, entry_point, url), range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "analyses": total,
+        "analyses_per_second": round(total / elapsed, 4),
+        "p95_seconds": round(percentile(latencies, 95), 4),
+    }
+
+
+def bench_memory(analyzer, entry_point, url, args):
+    reset_caches(args)
+    tracemalloc.start()
+    try:
+        run_once(analyzer, entry_point, url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_traced_bytes": peak}
+
+
+def bench_incremental(stubs, site, entry_point, args, cache_dir):
+    """Latency of a first analysis, an unchanged refresh and a refresh after one footer page changed."""
+    analyzer = build_analyzer(stubs, args, cache_dir)
+    if analyzer.stage_store is None:
+        analyzer.stage_store = StageStore(os.path.join(cache_dir, f"{entry_point}-stages.sqlite"))
+    timings = {}
+    for label in ("first", "unchanged", "one_page_changed"):
+        if label == "one_page_changed":
+            site.edits[0] = f"Updated {datetime.now(timezone.utc).isoformat()}: new enterprise products launched."
+        reset_caches(args)
+        timings[f"{label}_seconds"] = round(run_once(analyzer, entry_point, site.url), 4)
+    site.edits.clear()
+    return timings
+
+
+def bench_single_site(analyzer, url, args):
+    """compare_websites on the target alone, the floor for the full comparison's latency."""
+    reset_caches(args)
+    started = time.perf_counter()
+    analyzer.compare_websites(url, competitor_urls=[])
+    return time.perf_counter() - started
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions against ``baseline``."""
+    regressions = []
+    for entry_point, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(entry_point)
+        if not previous:
+            continue
+        for metric in ("p50_seconds", "p95_seconds"):
+            before, after = previous["latency"][metric], current["latency"][metric]
+            if after > before * (1 + tolerance):
+                regressions.append(f"{entry_point} {metric}: {before:.3f}s -> {after:.3f}s")
+        for before, after in zip(previous["throughput"], current["throughput"]):
+            if after["analyses_per_second"] < before["analyses_per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{entry_point} throughput@{after['concurrency']}: "
+                    f"{before['analyses_per_second']:.3f}/s -> {after['analyses_per_second']:.3f}/s"
+                )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks for WebsiteAnalyzer")
+    parser.add_argument("--iterations", type=int, default=5, help="Sequential runs per entry point for p50/p95")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="Concurrent analyses to measure throughput at")
+    parser.add_argument("--throughput-rounds", type=int, default=2, help="Analyses per worker in the throughput runs")
+    parser.add_argument("--footer-links", type=int, default=40)
+    parser.add_argument("--page-paragraphs", type=int, default=30)
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Seconds per footer page")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Seconds before the first LLM token")
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.002)
+    parser.add_argument("--tavily-latency", type=float, default=1.5)
+    parser.add_argument("--serper-latency", type=float, default=0.8)
+    parser.add_argument("--use-cases", type=int, default=8, help="Use cases in the fake LLM answer")
+    parser.add_argument("--competitor-sites", type=int, default=3,
+                        help="Fake competitor websites for compare_websites, served on 127.0.0.2 and up")
+    parser.add_argument("--render-processes", type=int, default=0)
+    parser.add_argument("--structured-output", action="store_true", help="Use the JSON prompts and parsers")
+    parser.add_argument("--with-caches", action="store_true", help="Keep HTTP/LLM/competitor caches warm between runs")
+    parser.add_argument("--entry-points", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS))
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    site = FakeWebsite(args.footer_links, args.page_paragraphs, args.page_latency).start()
+    competitor_sites = [
+        FakeWebsite(args.footer_links, args.page_paragraphs, args.page_latency, host=f"127.0.0.{i + 2}").start()
+        for i in range(args.competitor_sites)
+    ]
+    stubs = Stubs(args, [competitor.url for competitor in competitor_sites])
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline")},
+        "scenarios": {},
+    }
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analyzer = build_analyzer(stubs, args, cache_dir)
+            # One untimed run warms imports and connection pools
+            run_once(analyzer, args.entry_points[0], site.url)
+            for entry_point in args.entry_points:
+                scenario = {
+                    "latency": bench_latency(analyzer, entry_point, site.url, args),
+                    "throughput": [bench_throughput(analyzer, entry_point, site.url, n, args) for n in args.concurrency],
+                    "memory": bench_memory(analyzer, entry_point, site.url, args),
+                    "incremental": bench_incremental(stubs, site, entry_point, args, cache_dir),
+                }
+                if entry_point == "compare_websites":
+                    scenario["single_site_seconds"] = round(bench_single_site(analyzer, site.url, args), 4)
+                results["scenarios"][entry_point] = scenario
+                latency = scenario["latency"]
+                print(f"{entry_point}: p50 {latency['p50_seconds']:.3f}s  p95 {latency['p95_seconds']:.3f}s  "
+                      f"peak {scenario['memory']['peak_traced_bytes'] / 1e6:.1f} MB")
+                for row in scenario["throughput"]:
+                    print(f"  concurrency {row['concurrency']}: {row['analyses_per_second']:.3f} analyses/s")
+                print("  refresh: " + ", ".join(f"{name[:-8]} {value:.3f}s" for name, value in scenario["incremental"].items()))
+                if "single_site_seconds" in scenario:
+                    print(f"  target alone: {scenario['single_site_seconds']:.3f}s")
+    finally:
+        site.stop()
+        for competitor in competitor_sites:
+            competitor.stop()
+
+    results["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["external_calls"] = {"llm": stubs.llm.calls, "tavily": stubs.tavily.calls,
+                                 "serper": stubs.serper.calls,
+                                 "site_requests": site.requests + sum(c.requests for c in competitor_sites)}
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    for path in (os.path.join(RESULTS_DIR, f"{stamp}.json"), os.path.join(RESULTS_DIR, "latest.json")):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(f"Results saved to {RESULTS_DIR}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import ast
+import threading
+import time
+from urllib.parse import urlsplit
+
+from rate_limit import rate_limits
+from singleflight import SingleFlight
+from tracing import record_cache, record_http
+
+
+def competitor_key(website):
+    """Reduce a URL or bare domain to the host used as the memo key."""
+    website = website.strip().lower()
+    host = urlsplit(website if "://" in website else f"//{website}").hostname or website
+    return host[4:] if host.startswith("www.") else host
+
+
+class CompetitorDiscovery:
+    """Memoized Tavily competitor lookup shared by every analyzer in the process.
+
+    The Tavily answer is fetched and parsed once per domain, separately for
+    competitor names and competitor websites. Parsed lists are
+    kept for ``ttl`` seconds and parse failures for ``failure_ttl`` seconds;
+    concurrent requests for the same domain share a single lookup. Tavily
+    errors are raised and not memoized.
+    """
+
+    def __init__(self, ttl=24 * 3600, failure_ttl=15 * 60):
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get(self, tavily_client, website):
+        """Competitor company names for ``website``."""
+        return self._memoized(competitor_key(website), lambda: self._lookup(tavily_client, website))
+
+    def get_sites(self, tavily_client, website):
+        """Homepage URLs of ``website``'s competitors, for crawling their own sites."""
+        key = competitor_key(website)
+        return self._memoized(f"sites:{key}", lambda: self._lookup_sites(tavily_client, website, key))
+
+    def _memoized(self, key, lookup_once):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            record_cache("tavily", hit=True)
+            return list(entry[1])
+        record_cache("tavily", hit=False)
+
+        def lookup():
+            competitors, ok = lookup_once()
+            ttl = self.ttl if ok else self.failure_ttl
+            with self._lock:
+                self._entries[key] = (time.time() + ttl, competitors)
+            return competitors
+
+        return list(self._flight.do(key, lookup))
+
+    def _lookup(self, tavily_client, website):
+        answer = rate_limits.call(
+            "tavily", tavily_client.qna_search, query=f"List 5 competitors to {website} in an array"
+        )
+        record_http("tavily", len(str(answer)))
+        try:
+            competitors = ast.literal_eval(answer)
+            if not isinstance(competitors, (list, tuple)):
+                raise ValueError(f"expected a list, got {type(competitors).__name__}")
+            return list(competitors), True
+        except Exception as e:
+            print(f"Error parsing competitors: {e}")
+            return [], False
+
+    def _lookup_sites(self, tavily_client, website, own_key):
+        answer = rate_limits.call(
+            "tavily", tavily_client.qna_search,
+            query=f"List the official website domains of 5 competitors to {website} in an array"
+        )
+        record_http("tavily", len(str(answer)))
+        try:
+            domains = ast.literal_eval(answer)
+            if not isinstance(domains, (list, tuple)):
+                raise ValueError(f"expected a list, got {type(domains).__name__}")
+        except Exception as e:
+            print(f"Error parsing competitor sites: {e}")
+            return [], False
+        sites = {}
+        for domain in domains:
+            domain = str(domain).strip()
+            key = competitor_key(domain)
+            # Keep entries that look like a host name; drop the site itself and repeats
+            if "." in key and " " not in key and key != own_key:
+                sites.setdefault(key, domain if "://" in domain else f"https://{domain}")
+        return list(sites.values()), True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# One instance per process so Streamlit sessions share lookups
+competitor_discovery = CompetitorDiscovery()
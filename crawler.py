@@ -0,0 +1,195 @@
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from extraction import ExtractionReport, dedupe_blocks, extract_text
+from http_cache import CachedResponse
+from tracing import record_cache, record_http
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# Links with these extensions are never HTML, so they are skipped without a request
+NON_HTML_EXTENSIONS = {
+    ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z", ".exe", ".dmg", ".apk",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".bmp",
+    ".mp3", ".wav", ".mp4", ".mov", ".avi", ".webm", ".mkv",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", ".json", ".xml",
+}
+
+
+class SkippedPage(Exception):
+    """Raised when a page is deliberately not downloaded or parsed."""
+
+
+class CrawlReport(ExtractionReport):
+    """Extraction stats plus the reason each URL was skipped or failed."""
+
+    def __init__(self):
+        super().__init__()
+        self.skipped = OrderedDict()
+
+    def record_skip(self, url, reason):
+        with self._lock:
+            self.skipped[url] = reason
+
+    def to_dict(self):
+        stats = super().to_dict()
+        stats["skipped"] = dict(self.skipped)
+        return stats
+
+    def summary(self):
+        return f"{super().summary()}; {len(self.skipped)} URLs skipped or failed"
+
+
+class FooterCrawler:
+    """Fetches many pages concurrently over pooled keep-alive connections.
+
+    ``max_workers`` bounds the total number of in-flight requests, across
+    every crawl running on this crawler at once, and ``max_per_host`` bounds
+    how many of those may target the same host.
+    Every request uses ``timeout`` (connect, read) seconds, bodies are
+    streamed and abandoned past ``max_bytes``, non-HTML responses are dropped
+    after their headers arrive, and ``crawl`` fetches at most ``max_pages``.
+    """
+
+    def __init__(self, max_workers=16, max_per_host=4, pool_hosts=32, cache=None,
+                 timeout=(5, 15), max_bytes=2 * 1024 * 1024, max_pages=40):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+
+        # One session shared by every worker thread; urllib3 keeps a
+        # connection pool per host, sized to the per-host limit
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        # Shared by concurrent crawls, e.g. a site and its competitors compared side by side
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    def fetch(self, url):
+        if self.cache is None:
+            return self._get(url)
+
+        entry = self.cache.lookup(url)
+        if entry is not None and entry.is_fresh:
+            self.cache.record_hit(entry)
+            record_cache("http", hit=True)
+            return entry.to_response(url)
+
+        # Stale or missing: revalidate with the stored validators if we have them
+        headers = entry.conditional_headers() if entry is not None else {}
+        started = time.perf_counter()
+        response = self._get(url, headers=headers)
+        elapsed = time.perf_counter() - started
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(entry, response.headers)
+            self.cache.record_revalidated(entry, elapsed)
+            record_cache("http", hit=True)
+            return entry.to_response(url)
+
+        self.cache.record_miss()
+        record_cache("http", hit=False)
+        self.cache.store(url, response, elapsed)
+        return response
+
+    def _get(self, url, headers=None):
+        extension = os.path.splitext(urlsplit(url).path)[1].lower()
+        if extension in NON_HTML_EXTENSIONS:
+            raise SkippedPage(f"non-HTML link ({extension})")
+
+        with self._host_semaphore(url), self._slots:
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    return CachedResponse(response.url, b"", response.headers, 304, from_cache=False)
+                response.raise_for_status()
+
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in HTML_CONTENT_TYPES:
+                    raise SkippedPage(f"non-HTML content type ({content_type})")
+
+                declared = response.headers.get("Content-Length")
+                if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                    raise SkippedPage(f"body of {declared} bytes exceeds {self.max_bytes} byte cap")
+
+                body = bytearray()
+                try:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        body += chunk
+                        if len(body) > self.max_bytes:
+                            raise SkippedPage(f"body exceeds {self.max_bytes} byte cap")
+                finally:
+                    record_http("crawl", len(body))
+
+        # response.url is the final URL after redirects, which relative links resolve against
+        return CachedResponse(response.url, bytes(body), response.headers, response.status_code, from_cache=False)
+
+    def fetch_text(self, url, report=None):
+        response = self.fetch(url)
+        text = extract_text(response.content)
+        if report is not None:
+            report.record_page(len(response.content), len(text.encode("utf-8")))
+        return text
+
+    def crawl(self, urls, report=None):
+        # Keep first-seen order; duplicate URLs are only fetched once
+        results = OrderedDict.fromkeys(urls)
+        if not results:
+            return results
+
+        to_fetch = list(results)
+        if self.max_pages is not None and len(to_fetch) > self.max_pages:
+            # Pages over the cap stay inline like any other skipped page
+            for url in to_fetch[self.max_pages:]:
+                results[url] = f"Failed to fetch content: skipped, page cap of {self.max_pages} reached"
+                if report is not None:
+                    report.record_skip(url, f"page cap of {self.max_pages} reached")
+            to_fetch = to_fetch[:self.max_pages]
+
+        workers = min(self.max_workers, len(to_fetch))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Workers inherit the caller's context so their requests count toward its trace
+            futures = [
+                (url, pool.submit(contextvars.copy_context().run, self.fetch_text, url, report))
+                for url in to_fetch
+            ]
+            for url, future in futures:
+                try:
+                    results[url] = future.result()
+                except SkippedPage as e:
+                    results[url] = f"Failed to fetch content: skipped, {str(e)}"
+                    if report is not None:
+                        report.record_skip(url, str(e))
+                except Exception as e:
+                    results[url] = f"Failed to fetch content: {str(e)}"
+                    if report is not None:
+                        report.record_skip(url, f"error: {str(e)}")
+
+        # Nav items, banners and other blocks repeated across pages are kept once
+        return OrderedDict(dedupe_blocks(results, report))
+
+    def close(self):
+        self.session.close()
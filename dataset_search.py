@@ -0,0 +1,146 @@
+import contextvars
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limit import rate_limits
+from tracing import record_http
+
+SERPER_URL = "https://google.serper.dev/search"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "and", "ai", "for", "in", "of", "on", "the", "to", "with"}
+
+
+def empty_links():
+    return {"github_links": [], "kaggle_links": [], "huggingface_links": []}
+
+
+def normalize_keywords(keywords):
+    """Reduce a keyword list to a comparable set of lower-case word stems."""
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    tokens = set()
+    for keyword in keywords:
+        for token in _TOKEN_RE.findall(keyword.lower()):
+            if token in _STOPWORDS:
+                continue
+            # Crude plural folding is enough to merge "models"/"model"
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.add(token)
+    return frozenset(tokens)
+
+
+def _similarity(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class DatasetLinkSearcher:
+    """Looks up GitHub/Kaggle/Hugging Face links for use-case keywords via Serper.
+
+    ``search_many`` (and ``batch`` for incremental use) collapses identical or
+    near-identical keyword sets (Jaccard similarity >= ``similarity_threshold``)
+    into one query and runs the remaining queries concurrently over a pooled
+    session. Every request uses ``timeout`` (connect, read) seconds.
+    """
+
+    def __init__(self, api_key, max_workers=8, similarity_threshold=0.75, timeout=(5, 30)):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.similarity_threshold = similarity_threshold
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+
+    def search(self, keywords):
+        payload = json.dumps({
+            "q": f"provide kaggle/hugging face datasets related to topic {keywords}",
+            "gl": "in"
+        })
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+
+        def post():
+            response = self.session.post(SERPER_URL, headers=headers, data=payload, timeout=self.timeout)
+            record_http("serper", len(response.content))
+            response.raise_for_status()
+            return response
+
+        # Errors are raised, not swallowed: empty links would look like a real "no datasets" answer
+        data = rate_limits.call("serper", post).json()
+
+        links = empty_links()
+        for result in data.get('organic', []):
+            if 'github.com' in result['link']:
+                links["github_links"].append(result['link'])
+            elif 'kaggle.com' in result['link']:
+                links["kaggle_links"].append(result['link'])
+            elif 'huggingface.co' in result['link']:
+                links["huggingface_links"].append(result['link'])
+        return links
+
+    def batch(self, executor):
+        """Start an incremental batch whose lookups run on ``executor``."""
+        return DatasetLookupBatch(self, executor)
+
+    def search_many(self, keywords_by_use_case):
+        if not keywords_by_use_case:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            batch = self.batch(pool)
+            futures = {
+                use_case: batch.submit(keywords)
+                for use_case, keywords in keywords_by_use_case.items()
+            }
+            # Each use case gets its own copy so callers can edit them independently
+            return {
+                use_case: {kind: list(links) for kind, links in future.result().items()}
+                for use_case, future in futures.items()
+            }
+
+    def close(self):
+        self.session.close()
+
+
+class DatasetLookupBatch:
+    """Deduplicates lookups submitted one at a time, e.g. while use cases stream in.
+
+    A submission whose keyword set is near-identical to an earlier one shares
+    that earlier query's future instead of issuing a new Serper request.
+    """
+
+    def __init__(self, searcher, executor):
+        self.searcher = searcher
+        self.executor = executor
+        self._groups = []  # (normalized tokens, future)
+        self._lock = threading.Lock()
+
+    def submit(self, keywords):
+        if isinstance(keywords, str):
+            keywords = [keyword.strip() for keyword in keywords.split(",")]
+        tokens = normalize_keywords(keywords)
+
+        with self._lock:
+            for group_tokens, future in self._groups:
+                if _similarity(tokens, group_tokens) >= self.searcher.similarity_threshold:
+                    return future
+            query = " ".join(keyword for keyword in keywords if keyword)
+            future = self.executor.submit(contextvars.copy_context().run, self.searcher.search, query)
+            self._groups.append((tokens, future))
+            return future
+
+    @property
+    def query_count(self):
+        return len(self._groups)
@@ -0,0 +1,141 @@
+import hashlib
+import re
+import threading
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional; BeautifulSoup's html.parser is the fallback
+    lxml = None
+
+# Page chrome that repeats on every page and carries no company information
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside", "form")
+
+# Whole id/class/role/aria-label tokens of overlays; "hero-banner" or "modal-open" are not matched
+_BOILERPLATE_TOKEN_RE = re.compile(
+    r"(?:cookies?|gdpr|consent)(?:[-_]?(?:banner|notice|bar|consent|popup|modal|dialog|wrapper|container|overlay))*"
+    r"|cookieconsent|newsletter[-_]?(?:signup|popup|modal)|(?:popup|modal)[-_]?(?:overlay|backdrop)",
+    re.IGNORECASE
+)
+_MARKER_ATTRS = ("id", "class", "role", "aria-label")
+# Page wrappers are never dropped, whatever their classes say
+_CONTENT_ROOTS = frozenset(("html", "body", "main", "article"))
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Same rough ratio as retrieval.estimate_tokens
+BYTES_PER_TOKEN = 4
+
+
+def _is_boilerplate_container(tag, attrs):
+    if tag in _CONTENT_ROOTS:
+        return False
+    for name in _MARKER_ATTRS:
+        value = attrs.get(name) or ""
+        tokens = value if isinstance(value, list) else str(value).split()
+        if any(_BOILERPLATE_TOKEN_RE.fullmatch(token) for token in tokens):
+            return True
+    return False
+
+
+def _extract_with_lxml(content):
+    tree = lxml.html.fromstring(content)
+    etree.strip_elements(tree, *BOILERPLATE_TAGS, etree.Comment, with_tail=False)
+    for element in tree.xpath("//*[@id or @class or @role or @aria-label]"):
+        if element.getparent() is not None and _is_boilerplate_container(element.tag, element.attrib):
+            element.drop_tree()
+    lines = (text.strip() for text in tree.itertext())
+    return "\n".join(line for line in lines if line)
+
+
+def _extract_with_bs4(content):
+    soup = BeautifulSoup(content, "html.parser")
+    for element in soup(BOILERPLATE_TAGS):
+        element.decompose()
+    # Same attributes as the lxml path
+    for element in soup.find_all(lambda tag: any(name in tag.attrs for name in _MARKER_ATTRS)):
+        if not element.decomposed and _is_boilerplate_container(element.name, element.attrs):
+            element.decompose()
+    return soup.get_text(separator="\n", strip=True)
+
+
+def extract_text(content):
+    """Return the visible text of an HTML page without scripts, styles and page chrome."""
+    if not content:
+        return ""
+    if lxml is not None:
+        try:
+            return _extract_with_lxml(content)
+        except (etree.ParserError, ValueError):
+            pass
+    return _extract_with_bs4(content)
+
+
+class ExtractionReport:
+    """Bytes and estimated tokens removed by boilerplate stripping and block dedup."""
+
+    def __init__(self):
+        self.pages = 0
+        self.html_bytes = 0
+        self.text_bytes = 0
+        self.deduped_bytes = 0
+        self.duplicate_blocks = 0
+        self._lock = threading.Lock()
+
+    def record_page(self, html_bytes, text_bytes):
+        with self._lock:
+            self.pages += 1
+            self.html_bytes += html_bytes
+            self.text_bytes += text_bytes
+
+    def to_dict(self):
+        return {
+            "pages": self.pages,
+            "html_bytes": self.html_bytes,
+            "text_bytes": self.text_bytes,
+            "deduped_text_bytes": self.deduped_bytes,
+            "duplicate_blocks": self.duplicate_blocks,
+            "bytes_saved_by_dedup": self.text_bytes - self.deduped_bytes,
+            "tokens_saved_by_dedup": (self.text_bytes - self.deduped_bytes) // BYTES_PER_TOKEN,
+            "tokens_sent": self.deduped_bytes // BYTES_PER_TOKEN,
+        }
+
+    def summary(self):
+        stats = self.to_dict()
+        return (
+            f"Extracted {stats['pages']} pages: {stats['html_bytes']} HTML bytes -> "
+            f"{stats['text_bytes']} text bytes -> {stats['deduped_text_bytes']} after dedup "
+            f"({stats['duplicate_blocks']} repeated blocks, ~{stats['tokens_saved_by_dedup']} tokens saved)"
+        )
+
+
+def dedupe_blocks(pages, report=None, min_length=1):
+    """Drop text blocks (lines) already seen on an earlier page.
+
+    ``pages`` maps URL to extracted text and is processed in order, so the
+    first page to contain a shared nav item or banner keeps it. Failure
+    messages are left untouched.
+    """
+    seen = set()
+    deduped = {}
+    for url, text in pages.items():
+        if not text or text.startswith("Failed to fetch content"):
+            deduped[url] = text
+            continue
+        kept = []
+        for block in text.split("\n"):
+            normalized = _WHITESPACE_RE.sub(" ", block).strip().lower()
+            if len(normalized) < min_length:
+                continue
+            digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+            if digest in seen:
+                if report is not None:
+                    report.duplicate_blocks += 1
+                continue
+            seen.add(digest)
+            kept.append(block)
+        deduped[url] = "\n".join(kept)
+        if report is not None:
+            report.deduped_bytes += len(deduped[url].encode("utf-8"))
+    return deduped
@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Canonical cache key: lower-case scheme/host, no default port or fragment, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class CachedResponse:
+    """Minimal response object returned for pages served from the cache."""
+
+    def __init__(self, url, content, headers, status_code=200, from_cache=True):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        pass
+
+
+class CacheEntry:
+    def __init__(self, key, content, content_type, etag, last_modified, expires_at, fetch_seconds, final_url=None):
+        self.key = key
+        self.content = content
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self.fetch_seconds = fetch_seconds
+        self.final_url = final_url
+
+    @property
+    def is_fresh(self):
+        return time.time() < self.expires_at
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, url):
+        # The URL the page was served from after redirects, as on a live response
+        return CachedResponse(self.final_url or url, self.content, {"Content-Type": self.content_type or ""})
+
+
+class DiskHTTPCache:
+    """SQLite-backed page cache with TTLs, conditional revalidation and LRU eviction.
+
+    Entries are keyed by ``normalize_url``. A fresh entry is served without
+    touching the network; a stale one is revalidated with its ETag and
+    Last-Modified validators. Once the stored bodies exceed ``max_bytes`` the
+    least recently used entries are dropped.
+    """
+
+    def __init__(self, path=".cache/http.sqlite", max_bytes=200 * 1024 * 1024, default_ttl=24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                content BLOB NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                fetch_seconds REAL NOT NULL,
+                final_url TEXT
+            )
+        """)
+        # Caches created before redirects were tracked lack the final URL column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if "final_url" not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN final_url TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+
+    def _ttl_for(self, headers):
+        """Seconds a response may be served without revalidation; None if it must not be stored."""
+        directives = {}
+        for directive in headers.get("Cache-Control", "").lower().split(","):
+            name, _, value = directive.partition("=")
+            directives[name.strip()] = value.strip().strip('"')
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            # Kept for its validators, but revalidated on every use
+            return 0
+        if directives.get("max-age", "").isdigit():
+            return int(directives["max-age"])
+        return self.default_ttl
+
+    def lookup(self, url):
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, content_type, etag, last_modified, expires_at, fetch_seconds, final_url "
+                "FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(key, *row)
+
+    def store(self, url, response, fetch_seconds):
+        ttl = self._ttl_for(response.headers)
+        if ttl is None:
+            return
+        key = normalize_url(url)
+        content = response.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, content, response.headers.get("Content-Type"), response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), len(content), now + ttl, now, fetch_seconds,
+                 response.url)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, entry, headers):
+        # 304 Not Modified: keep the body, extend its lifetime and pick up new validators
+        ttl = self._ttl_for(headers)
+        with self._lock:
+            if ttl is None:
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (entry.key,))
+                self._conn.commit()
+                return
+            self._conn.execute(
+                "UPDATE pages SET expires_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (time.time() + ttl, headers.get("ETag"), headers.get("Last-Modified"), entry.key)
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM pages ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def record_hit(self, entry):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.content)
+            self.seconds_saved += entry.fetch_seconds
+
+    def record_revalidated(self, entry, elapsed):
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry.content)
+            self.seconds_saved += max(entry.fetch_seconds - elapsed, 0.0)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "entries": entries,
+                "size_bytes": size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,154 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import PipelineCancelled
+
+# User-facing stages, in display order, and the pipeline stages behind each one
+JOB_STAGES = OrderedDict([
+    ("crawl", ("footer_content",)),
+    ("competitors", ("competitor_analysis_raw",)),
+    ("company analysis", ("company_analysis_raw",)),
+    ("use cases", ("use_cases",)),
+    ("datasets", ("dataset_links",)),
+    ("rendering", ("company_pdf", "use_cases_pdf")),
+])
+# Extra stages of a job that also compares the competitors' own websites
+COMPARE_STAGES = OrderedDict([
+    ("competitor sites", ("competitor_sites",)),
+    ("comparison", ("comparison_pdf",)),
+])
+
+
+class Job:
+    def __init__(self, website_url, refresh=False, compare=False):
+        self.id = uuid.uuid4().hex
+        self.website_url = website_url
+        self.refresh = refresh
+        self.compare = compare
+        self.status = "queued"  # queued, running, done, failed, cancelled
+        self.pipeline_stages = {}
+        self.use_cases = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+
+    def _on_stage(self, name, state):
+        with self._lock:
+            self.pipeline_stages[name] = state
+
+    def _on_use_case(self, use_case):
+        with self._lock:
+            self.use_cases.append(use_case)
+
+    def stage_states(self):
+        """Map each user-facing stage to "pending", "running", "done" or "failed"."""
+        with self._lock:
+            states = OrderedDict()
+            stages = list(JOB_STAGES.items()) + (list(COMPARE_STAGES.items()) if self.compare else [])
+            for label, names in stages:
+                parts = [self.pipeline_stages.get(name, "pending") for name in names]
+                if "failed" in parts:
+                    states[label] = "failed"
+                elif all(part == "done" for part in parts):
+                    states[label] = "done"
+                elif any(part != "pending" for part in parts):
+                    states[label] = "running"
+                else:
+                    states[label] = "pending"
+            return states
+
+    def progress(self):
+        states = self.stage_states()
+        return sum(state == "done" for state in states.values()) / len(states)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+
+class JobQueue:
+    """Runs analyses in background threads, at most ``max_concurrent`` at a time.
+
+    Finished jobs are kept for ``retention`` seconds so sessions can pick up
+    their results.
+    """
+
+    def __init__(self, analyzer, max_concurrent=2, retention=3600):
+        self.analyzer = analyzer
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="analysis-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, website_url, refresh=False, compare=False):
+        job = Job(website_url, refresh, compare)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        # A job still waiting for a worker never starts
+        if job.future is not None and job.future.cancel():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        return True
+
+    def active_count(self):
+        with self._lock:
+            return sum(not job.finished for job in self._jobs.values())
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = self.analyzer.analyze_and_generate_pdfs(
+                job.website_url,
+                refresh=job.refresh,
+                on_use_case=job._on_use_case,
+                on_stage=job._on_stage,
+                cancel_event=job.cancel_event,
+                compare=job.compare
+            )
+            job.status = "done"
+        except PipelineCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
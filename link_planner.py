@@ -0,0 +1,124 @@
+import os
+import re
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from crawler import NON_HTML_EXTENSIONS
+from http_cache import normalize_url
+
+try:
+    import lxml  # noqa: F401
+    _PARSER = "lxml"
+except ImportError:  # lxml is optional; BeautifulSoup's html.parser is the fallback
+    _PARSER = "html.parser"
+
+_FOOTER_ONLY = SoupStrainer("footer")
+
+# Query parameters that only track the click and never change the page
+_TRACKING_PARAMS_RE = re.compile(r"^(?:utm_\w+|gclid|fbclid|msclkid|mc_[ce]id|_ga|ref|source)$", re.IGNORECASE)
+
+# Pages that describe the company, what it sells and to whom, matched against the path and link text
+_HIGH_VALUE_RE = re.compile(
+    r"about|company|who-?we-?are|mission|vision|values|story|"
+    r"product|solution|service|platform|offering|feature|technolog|"
+    r"industr|customer|case-?stud|client|partner|investor|leadership|team",
+    re.IGNORECASE,
+)
+_MEDIUM_VALUE_RE = re.compile(r"news|press|blog|insight|resource|research|careers?|jobs|sustainab|esg", re.IGNORECASE)
+# Pages with no company information: legal text, sign-in and shop flows. Matched
+# against whole path segments and the whole link text, so /accounting or
+# "Legal AI" are not caught
+_LOW_VALUE_RE = re.compile(
+    r"(?:privacy|terms|cookies?|legal|gdpr|imprint|impressum|disclaimer|accessibility|sitemap)"
+    r"(?:-(?:policy|notice|statement|of-use|of-service|and-conditions|conditions|information|settings))*|"
+    r"log-?in|sign-?in|sign-?up|log-?out|register|my-?account|account|cart|checkout|unsubscribe",
+    re.IGNORECASE,
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def footer_links(content):
+    """``(href, link text)`` of every link in the page's first ``<footer>``, or None without one.
+
+    Only footer elements are built into a tree; the rest of the page is
+    tokenized and discarded.
+    """
+    soup = BeautifulSoup(content, _PARSER, parse_only=_FOOTER_ONLY)
+    footer = soup.find("footer")
+    if footer is None:
+        return None
+    return [(link["href"], link.get_text(" ", strip=True)) for link in footer.find_all("a", href=True)]
+
+
+def canonicalize(url):
+    """Dedupe key for a page: ``normalize_url`` without ``www.``, tracking parameters or a trailing slash."""
+    parts = urlsplit(normalize_url(url))
+    # example.com and www.example.com are the same site to _same_site, so they are one page here
+    netloc = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS_RE.match(name)
+    ])
+    return urlunsplit(parts._replace(netloc=netloc, path=parts.path.rstrip("/") or "/", query=query))
+
+
+def _site_host(url):
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _same_site(host, site):
+    # The site itself and its subdomains (blog.example.com), in either direction for www-less hosts
+    host = host[4:] if host.startswith("www.") else host
+    return host == site or host.endswith(f".{site}") or site.endswith(f".{host}")
+
+
+def _is_low_value(url, text):
+    words = [segment for segment in urlsplit(url).path.split("/") if segment]
+    words.append(_NON_WORD_RE.sub("-", text.lower()).strip("-"))
+    return any(_LOW_VALUE_RE.fullmatch(word) for word in words)
+
+
+def _score(url, text):
+    if _is_low_value(url, text):
+        return -1
+    target = f"{urlsplit(url).path} {text}"
+    if _HIGH_VALUE_RE.search(target):
+        return 2
+    if _MEDIUM_VALUE_RE.search(target):
+        return 1
+    return 0
+
+
+def plan_footer_links(base_url, links, report=None):
+    """Turn raw footer links into the URLs worth fetching, most informative first.
+
+    ``base_url`` is the landing page's final URL after redirects. Links are
+    resolved against it and deduplicated by their canonical form, so repeats
+    and fragment-only variants of a page collapse into one fetch of the
+    first URL as linked. Non-HTTP targets (mail, phone, javascript), other
+    sites and files that are not HTML are dropped and recorded on
+    ``report``. Legal and sign-in pages go last; the rest keep footer order
+    within each value tier.
+    """
+    site = _site_host(base_url)
+    planned = {}  # canonical key -> [URL to fetch, score]
+    for href, text in links:
+        url = urldefrag(urljoin(base_url, href.strip())).url
+        scheme = urlsplit(url).scheme.lower()
+        if scheme not in ("http", "https"):
+            reason = f"non-HTTP link ({scheme or 'empty'})"
+        elif not _same_site(urlsplit(url).hostname or "", site):
+            reason = "off-site link"
+        elif os.path.splitext(urlsplit(url).path)[1].lower() in NON_HTML_EXTENSIONS:
+            reason = f"non-HTML link ({os.path.splitext(urlsplit(url).path)[1].lower()})"
+        else:
+            entry = planned.setdefault(canonicalize(url), [url, -1])
+            entry[1] = max(entry[1], _score(url, text))
+            continue
+        if report is not None:
+            report.record_skip(url, reason)
+
+    # sorted() is stable, so footer order is kept within a tier
+    return [url for url, _ in sorted(planned.values(), key=lambda entry: -entry[1])]
@@ -0,0 +1,187 @@
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from singleflight import SingleFlight
+from tracing import record_cache
+
+# Set through CachedLLM.bypass_cache(); StagePipeline copies the context into
+# its worker threads so a forced refresh covers every stage of one analysis
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+def prompt_key(model_name, prompt):
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CachedMessage:
+    """Stands in for the LangChain message returned by ``invoke``."""
+
+    def __init__(self, content, from_cache=True):
+        self.content = content
+        self.from_cache = from_cache
+
+
+class SQLiteLLMCache:
+    """Local response store with per-entry TTL and LRU eviction by total size."""
+
+    def __init__(self, path=".cache/llm.sqlite", ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return content
+
+    def set(self, key, model, content):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, size, now + self.ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLM:
+    """Wraps a chat model so identical prompts are answered from ``cache``.
+
+    Any object with ``get(key)`` and ``set(key, model, content)`` can serve as
+    the cache. Identical prompts issued concurrently share one model call.
+    """
+
+    def __init__(self, llm, cache, model_name=None):
+        self.llm = llm
+        self.cache = cache
+        self.model_name = model_name or getattr(llm, "model", llm.__class__.__name__)
+        self.bypass = False
+        self.hits = 0
+        self.misses = 0
+        self._flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def bypass_cache(self):
+        """Force fresh model calls (results are still written back) within this block."""
+        token = _bypass.set(True)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def invoke(self, prompt, **kwargs):
+        key = prompt_key(self.model_name, prompt)
+        refresh = self.bypass or _bypass.get()
+
+        if not refresh:
+            content = self.cache.get(key)
+            if content is not None:
+                with self._stats_lock:
+                    self.hits += 1
+                record_cache("llm", hit=True)
+                return CachedMessage(content)
+
+        def call():
+            with self._stats_lock:
+                self.misses += 1
+            record_cache("llm", hit=False)
+            response = self.llm.invoke(prompt, **kwargs)
+            self.cache.set(key, self.model_name, response.content)
+            return response
+
+        return self._flight.do(key, call)
+
+    def stream(self, prompt, **kwargs):
+        """Yield message chunks; a cached answer arrives as a single chunk."""
+        key = prompt_key(self.model_name, prompt)
+        refresh = self.bypass or _bypass.get()
+
+        if not refresh:
+            content = self.cache.get(key)
+            if content is not None:
+                with self._stats_lock:
+                    self.hits += 1
+                record_cache("llm", hit=True)
+                yield CachedMessage(content)
+                return
+
+        with self._stats_lock:
+            self.misses += 1
+        record_cache("llm", hit=False)
+        parts = []
+        for chunk in self.llm.stream(prompt, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        # Only a fully consumed stream is worth caching
+        self.cache.set(key, self.model_name, "".join(parts))
+
+    def stats(self):
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
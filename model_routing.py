@@ -0,0 +1,249 @@
+import contextvars
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import tracing
+from retrieval import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Model tiers: the model each tier calls and the rate-limit/breaker provider it counts against
+MODEL_TIERS = {
+    "fast": {"model": "gemini-1.5-flash", "provider": "gemini-fast"},
+    "strong": {"model": "gemini-1.5-pro", "provider": "gemini"},
+}
+
+# Estimated list prices in USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+}
+
+
+class Route:
+    """The tier a stage calls first, its per-attempt timeout and the tiers to fall back to."""
+
+    def __init__(self, tier, timeout=60.0, fallbacks=()):
+        self.tier = tier
+        self.timeout = timeout
+        self.fallbacks = tuple(fallbacks)
+
+    @property
+    def tiers(self):
+        return (self.tier,) + tuple(tier for tier in self.fallbacks if tier != self.tier)
+
+
+# Summaries go to the fast tier; use-case generation needs the stronger model
+DEFAULT_ROUTES = {
+    "company_analysis": Route("fast", timeout=60, fallbacks=("strong",)),
+    "competitor_analysis": Route("fast", timeout=60, fallbacks=("strong",)),
+    "use_cases": Route("strong", timeout=180, fallbacks=("fast",)),
+}
+
+
+def parse_routes(spec):
+    """Routes from a JSON object such as ``{"use_cases": {"tier": "fast", "timeout": 90}}``.
+
+    A bare tier name (``{"company_analysis": "strong"}``) keeps the stage's
+    default timeout and fallbacks.
+    """
+    routes = {}
+    for stage, value in json.loads(spec).items():
+        default = DEFAULT_ROUTES.get(stage, Route("strong"))
+        if isinstance(value, str):
+            value = {"tier": value}
+        routes[stage] = Route(
+            value.get("tier", default.tier),
+            float(value.get("timeout", default.timeout)),
+            value.get("fallbacks", default.fallbacks)
+        )
+    return routes
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+def _usage(response, prompt, completion):
+    # LangChain messages carry the provider's token counts; otherwise estimate from the text
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (usage.get("input_tokens") or estimate_tokens(str(prompt)),
+            usage.get("output_tokens") or estimate_tokens(completion))
+
+
+def _call_with_timeout(func, timeout):
+    """Run ``func`` in a daemon thread and wait at most ``timeout`` seconds for it.
+
+    A call that times out keeps running in the background; its result is dropped.
+    """
+    future = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            future.set_result(context.run(func))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True, name="llm-call").start()
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        raise TimeoutError() from None
+
+
+_END = object()
+
+
+class _TimedStream:
+    """Pulls chunks from a model stream in a daemon thread so waits can time out."""
+
+    def __init__(self, llm, prompt):
+        self._chunks = queue.Queue()
+        self._stop = threading.Event()
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._pump, llm, prompt), daemon=True, name="llm-stream").start()
+
+    def _pump(self, llm, prompt):
+        try:
+            for chunk in llm.stream(prompt):
+                if self._stop.is_set():
+                    return
+                self._chunks.put(chunk)
+            self._chunks.put(_END)
+        except BaseException as e:
+            self._chunks.put(e)
+
+    def next(self, deadline):
+        """The next chunk, or _END; raises TimeoutError once ``deadline`` has passed."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError()
+        try:
+            item = self._chunks.get(timeout=remaining)
+        except queue.Empty:
+            raise TimeoutError() from None
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def close(self):
+        self._stop.set()
+
+
+class ModelRouter:
+    """Sends each LLM stage to the model tier its route names.
+
+    Every attempt gets the route's timeout; on an error or timeout the next
+    fallback tier is tried. Latency and estimated cost of each call are
+    recorded on the current trace, summed per stage and model in
+    ``stats()`` and logged.
+    """
+
+    def __init__(self, llms, models, routes=None):
+        self.llms = llms      # tier -> chat model
+        self.models = models  # tier -> model name
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def route(self, stage):
+        return self.routes.get(stage) or Route("strong")
+
+    def route_key(self, stage):
+        """The models ``stage`` may be answered by, in order; part of its stored-output key."""
+        return [self.models[tier] for tier in self.route(stage).tiers]
+
+    def _record(self, stage, tier, seconds, prompt, completion="", response=None, outcome="ok", cached=False):
+        model = self.models[tier]
+        cost = 0.0
+        if outcome == "ok" and not cached:
+            cost = estimate_cost(model, *_usage(response, prompt, completion))
+        with self._lock:
+            stats = self._stats.setdefault((stage, model), {
+                "calls": 0, "failures": 0, "timeouts": 0, "seconds": 0.0, "cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["cost_usd"] += cost
+            if outcome != "ok":
+                stats["timeouts" if outcome == "timeout" else "failures"] += 1
+        tracing.record("llm_seconds", seconds, model)
+        tracing.record("llm_cost_usd", cost, model)
+        if outcome == "timeout":
+            tracing.record("llm_timeouts", 1, model)
+        logger.info("LLM %s: %s %s in %.2fs, est. $%.5f", stage, model, outcome, seconds, cost)
+
+    def _fallback(self, stage, tier, error, tiers):
+        later = tiers[tiers.index(tier) + 1:]
+        if later:
+            tracing.record("llm_fallbacks", 1, self.models[tier])
+            logger.warning("LLM %s: %s failed (%s), falling back to %s",
+                           stage, self.models[tier], type(error).__name__, self.models[later[0]])
+
+    def invoke(self, stage, prompt):
+        route = self.route(stage)
+        tiers = route.tiers
+        error = None
+        for tier in tiers:
+            started = time.perf_counter()
+            try:
+                response = _call_with_timeout(lambda: self.llms[tier].invoke(prompt), route.timeout)
+            except Exception as e:
+                outcome = "timeout" if isinstance(e, TimeoutError) else "error"
+                self._record(stage, tier, time.perf_counter() - started, prompt, outcome=outcome)
+                self._fallback(stage, tier, e, tiers)
+                error = e
+                continue
+            self._record(stage, tier, time.perf_counter() - started, prompt, response.content, response,
+                         cached=getattr(response, "from_cache", False))
+            return response
+        raise error
+
+    def stream(self, stage, prompt):
+        """Yield message chunks; falls back to the next tier only until the first chunk has arrived."""
+        route = self.route(stage)
+        tiers = route.tiers
+        error = None
+        for tier in tiers:
+            started = time.perf_counter()
+            deadline = time.monotonic() + route.timeout
+            chunks = _TimedStream(self.llms[tier], prompt)
+            try:
+                first = chunks.next(deadline)
+            except Exception as e:
+                chunks.close()
+                outcome = "timeout" if isinstance(e, TimeoutError) else "error"
+                self._record(stage, tier, time.perf_counter() - started, prompt, outcome=outcome)
+                self._fallback(stage, tier, e, tiers)
+                error = e
+                continue
+
+            completion = []
+            chunk = first
+            try:
+                while chunk is not _END:
+                    completion.append(chunk.content)
+                    yield chunk
+                    chunk = chunks.next(deadline)
+            except Exception as e:
+                outcome = "timeout" if isinstance(e, TimeoutError) else "error"
+                self._record(stage, tier, time.perf_counter() - started, prompt, outcome=outcome)
+                raise
+            finally:
+                chunks.close()
+            self._record(stage, tier, time.perf_counter() - started, prompt, "".join(completion),
+                         cached=getattr(first, "from_cache", False))
+            return
+        if error is not None:
+            raise error
+
+    def stats(self):
+        """(stage, model) -> calls, failures, timeouts, total seconds and estimated cost since start-up."""
+        with self._lock:
+            return {key: dict(values) for key, values in self._stats.items()}
@@ -0,0 +1,109 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class Stage:
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class StagePipeline:
+    """Runs a graph of stages, starting each one as soon as its inputs are ready.
+
+    Every stage function is called with the results of the stages it depends
+    on as keyword arguments, so independent stages run side by side and the
+    total wall-clock time follows the critical path of the graph.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add_stage(self, name, func, depends_on=()):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, depends_on)
+        return self
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        # Kahn's algorithm; anything left over sits on a cycle
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        while True:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        if remaining:
+            raise ValueError(f"Stage graph has a cycle: {sorted(remaining)}")
+
+    @staticmethod
+    def _run_stage(stage, kwargs):
+        with tracing.span(stage.name):
+            return stage.func(**kwargs)
+
+    def run(self, on_stage=None, cancel_event=None):
+        """Run every stage and return ``{stage name: result}``.
+
+        ``on_stage(name, state)`` is called with "running", "done" or "failed"
+        as stages change state. Setting ``cancel_event`` stops scheduling new
+        stages and raises PipelineCancelled without waiting for running ones.
+        """
+        self._validate()
+
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+
+        def notify(name, state):
+            if on_stage is not None:
+                on_stage(name, state)
+
+        def submit_ready(pool):
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.depends_on):
+                    kwargs = {dep: results[dep] for dep in stage.depends_on}
+                    # Each stage sees the caller's context variables (e.g. cache bypass)
+                    context = contextvars.copy_context()
+                    notify(name, "running")
+                    running[pool.submit(context.run, self._run_stage, stage, kwargs)] = name
+                    del pending[name]
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            submit_ready(pool)
+            while running:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PipelineCancelled()
+                done, _ = wait(running, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        notify(name, "failed")
+                        raise
+                    notify(name, "done")
+                submit_ready(pool)
+        except BaseException:
+            # Stop scheduling; stages already running are left to finish in the background
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+        return results
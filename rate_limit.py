@@ -0,0 +1,254 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from tracing import record
+
+# HTTP statuses worth retrying: throttling, timeouts and server-side failures
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Provider SDK errors that carry no HTTP response but mean "try again later"
+TRANSIENT_ERRORS = {"UsageLimitExceededError", "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError"}
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures.
+
+    While open, calls fail fast with ProviderUnavailable. After
+    ``reset_timeout`` seconds one trial call is let through; its outcome
+    closes the breaker or opens it again.
+    """
+
+    def __init__(self, provider, failure_threshold=5, reset_timeout=30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"  # closed, open, half_open
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+                return
+            retry_in = max(0.0, remaining)
+        raise ProviderUnavailable(
+            f"{self.provider} is unavailable after {self.failure_threshold} consecutive failures; "
+            f"retrying in {retry_in:.0f}s"
+        )
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Circuit breaker for {self.provider} opened")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def _status_code(exc):
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # google.api_core errors carry the HTTP status as ``code``
+        code = getattr(exc, "code", None)
+        status = code if isinstance(code, int) else None
+    return status
+
+
+def is_transient(exc):
+    """True for throttling, timeouts, connection errors and 5xx responses."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if type(exc).__name__ in TRANSIENT_ERRORS:
+        return True
+    return _status_code(exc) in TRANSIENT_STATUS
+
+
+def retry_after_seconds(exc):
+    """Seconds requested by a Retry-After header on the error's response, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Up to ``attempts`` tries with full-jitter exponential backoff.
+
+    A Retry-After header overrides the backoff; if it asks for more than
+    ``max_delay`` seconds the error is raised instead of waiting.
+    """
+
+    def __init__(self, attempts=4, base_delay=1.0, max_delay=30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, exc):
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RateLimits:
+    """Per-provider buckets, retry and circuit breakers shared by every thread in the process.
+
+    Providers without a configured rate are not limited, but their calls
+    made through ``call`` are still retried and guarded by a breaker.
+    """
+
+    def __init__(self, retry=None, failure_threshold=5, reset_timeout=30.0):
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._buckets = {}
+        self._breakers = {}
+        self._paused_until = {}
+        self._lock = threading.Lock()
+
+    def set_rate(self, provider, per_minute, burst=None):
+        with self._lock:
+            if per_minute:
+                self._buckets[provider] = TokenBucket(per_minute / 60.0, burst)
+            else:
+                self._buckets.pop(provider, None)
+
+    def acquire(self, provider, tokens=1):
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            paused_until = self._paused_until.get(provider, 0.0)
+        wait = paused_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if bucket is not None:
+            bucket.acquire(tokens)
+
+    def pause(self, provider, seconds):
+        """Hold back every caller of ``provider`` for ``seconds``, e.g. after a 429."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[provider] = max(self._paused_until.get(provider, 0.0), until)
+
+    def breaker(self, provider):
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(
+                    provider, self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def call(self, provider, func, *args, **kwargs):
+        """Run ``func`` under the provider's rate limit, retry policy and circuit breaker.
+
+        Non-transient errors (bad requests, invalid keys) are raised at once;
+        transient ones are retried and raised once the attempts run out.
+        """
+        breaker = self.breaker(provider)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            self.acquire(provider)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # The provider answered, so it is up; the request itself is at fault
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                delay = self.retry.delay(attempt - 1, e) if attempt < self.retry.attempts else None
+                if delay is None:
+                    raise
+                if retry_after_seconds(e) is not None:
+                    self.pause(provider, delay)
+                record("retries", 1, provider)
+                print(f"{provider} call failed ({e}); retry {attempt}/{self.retry.attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+
+rate_limits = RateLimits()
+
+
+class RateLimitedLLM:
+    """Sends each model call through ``rate_limits.call`` for the provider."""
+
+    def __init__(self, llm, provider="gemini"):
+        self.llm = llm
+        self.provider = provider
+
+    def invoke(self, prompt, **kwargs):
+        return rate_limits.call(self.provider, self.llm.invoke, prompt, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        # Only the start of the stream is retried; chunks already yielded can't be taken back
+        def start():
+            chunks = iter(self.llm.stream(prompt, **kwargs))
+            return chunks, next(chunks, None)
+
+        chunks, first = rate_limits.call(self.provider, start)
+        if first is None:
+            return
+        yield first
+        yield from chunks
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,75 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tracing import current_stage, record, span
+
+logger = logging.getLogger(__name__)
+
+# Built once per worker process by _init_worker
+_generator = None
+
+
+def _init_worker():
+    global _generator
+    # Imported here: website_analyzer imports this module
+    from website_analyzer import PDFGenerator
+    _generator = PDFGenerator()
+    # Build the shared style sheet now rather than during the first render
+    _generator.styles
+
+
+def _render(method, args):
+    started = time.perf_counter()
+    pdf_bytes = getattr(_generator, method)(*args)
+    return pdf_bytes, time.perf_counter() - started
+
+
+class ReportRenderer:
+    """Renders the PDF reports either in the calling thread or in worker processes.
+
+    With ``processes`` > 0 each report is built in a process pool whose workers
+    create their style sheet once at start-up, so ReportLab layout no longer
+    holds the server's GIL. ``render`` returns ``(pdf_bytes, seconds)``.
+    """
+
+    def __init__(self, pdf_generator, processes=0):
+        self.pdf_generator = pdf_generator
+        self.processes = processes
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        # Render stages and jobs run in parallel threads; only one of them may create the pool
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned rather than forked: a fork of this multithreaded process
+                # can inherit locks held by other threads and deadlock
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self._pool
+
+    def render(self, method, *args):
+        with span(f"render:{method}", stage=current_stage(), in_process=not self.processes) as render_span:
+            if not self.processes:
+                started = time.perf_counter()
+                pdf_bytes = getattr(self.pdf_generator, method)(*args)
+                seconds = time.perf_counter() - started
+            else:
+                pdf_bytes, seconds = self._get_pool().submit(_render, method, args).result()
+            if render_span is not None:
+                render_span.attributes.update({"render_seconds": round(seconds, 6), "pdf_bytes": len(pdf_bytes)})
+        record("pdf_bytes", len(pdf_bytes))
+        logger.debug("%s rendered %d bytes in %.2fs", method, len(pdf_bytes), seconds)
+        return pdf_bytes, seconds
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
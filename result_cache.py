@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+def normalize_site_url(url):
+    """Key for a site: lower-case host without ``www.``, path without trailing slash."""
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    return f"{host}{path}"
+
+
+class AnalysisResultCache:
+    """Process-wide store of finished analyses, fresh for ``ttl`` seconds.
+
+    At most ``max_entries`` sites are kept; the least recently used is
+    dropped first.
+    """
+
+    def __init__(self, ttl=6 * 3600, max_entries=100):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        key = normalize_site_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, url, result):
+        key = normalize_site_url(url)
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def age(self, url):
+        with self._lock:
+            entry = self._entries.get(normalize_site_url(url))
+        return None if entry is None else time.time() - entry[0]
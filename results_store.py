@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from competitors import competitor_key
+
+
+def _keywords(use_case):
+    keywords = use_case.get("keywords") or ""
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    return sorted({keyword.strip().lower() for keyword in keywords if keyword.strip()})
+
+
+class AnalysisStore:
+    """SQLite archive of every finished analysis in structured form.
+
+    Each run keeps the parsed company analysis, the competitor sections, the
+    use cases with their keywords and the dataset links, so past results can
+    be searched by domain, date or keyword and their PDFs rebuilt offline.
+    """
+
+    def __init__(self, path=".cache/results.sqlite"):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                domain TEXT NOT NULL,
+                url TEXT NOT NULL,
+                entry_point TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                company_analysis TEXT NOT NULL,
+                market_analysis TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_domain ON runs(domain, created_at);
+            CREATE INDEX IF NOT EXISTS runs_created_at ON runs(created_at);
+            CREATE TABLE IF NOT EXISTS competitors (
+                run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                details TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS competitors_run ON competitors(run_id);
+            CREATE TABLE IF NOT EXISTS use_cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                objective TEXT NOT NULL,
+                application TEXT NOT NULL,
+                benefits TEXT NOT NULL,
+                keywords TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS use_cases_run ON use_cases(run_id);
+            CREATE TABLE IF NOT EXISTS use_case_keywords (
+                use_case_id INTEGER NOT NULL REFERENCES use_cases(id) ON DELETE CASCADE,
+                keyword TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS use_case_keywords_keyword ON use_case_keywords(keyword);
+            CREATE TABLE IF NOT EXISTS dataset_links (
+                use_case_id INTEGER NOT NULL REFERENCES use_cases(id) ON DELETE CASCADE,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS dataset_links_use_case ON dataset_links(use_case_id);
+        """)
+        self._conn.commit()
+
+    def save(self, url, entry_point, company_analysis, competitor_analysis, use_cases, dataset_links):
+        """Store one finished analysis; returns its run id.
+
+        ``company_analysis`` and ``competitor_analysis`` are the parsed section
+        dicts, ``use_cases`` the parsed use cases and ``dataset_links`` maps a
+        use case title to its links.
+        """
+        market_analysis = {key: value for key, value in competitor_analysis.items() if key != "competitors"}
+        with self._lock, self._conn:
+            run_id = self._conn.execute(
+                """
+                INSERT INTO runs (domain, url, entry_point, created_at, company_analysis, market_analysis)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (competitor_key(url), url, entry_point, time.time(),
+                 json.dumps(company_analysis, ensure_ascii=False), json.dumps(market_analysis, ensure_ascii=False))
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO competitors (run_id, position, name, details) VALUES (?, ?, ?, ?)",
+                [(run_id, position, name, json.dumps(details, ensure_ascii=False))
+                 for position, (name, details) in enumerate(competitor_analysis.get("competitors", {}).items())]
+            )
+            for position, use_case in enumerate(use_cases):
+                use_case_id = self._conn.execute(
+                    """
+                    INSERT INTO use_cases (run_id, position, title, objective, application, benefits, keywords)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (run_id, position, use_case.get("title", ""), use_case.get("objective", ""),
+                     use_case.get("application", ""), json.dumps(use_case.get("benefits", []), ensure_ascii=False),
+                     use_case.get("keywords", "") if isinstance(use_case.get("keywords"), str)
+                     else ", ".join(use_case.get("keywords") or []))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO use_case_keywords (use_case_id, keyword) VALUES (?, ?)",
+                    [(use_case_id, keyword) for keyword in _keywords(use_case)]
+                )
+                links = dataset_links.get(use_case.get("title"), {})
+                self._conn.executemany(
+                    "INSERT INTO dataset_links (use_case_id, kind, url) VALUES (?, ?, ?)",
+                    [(use_case_id, kind, link) for kind, kind_links in links.items() for link in kind_links]
+                )
+        return run_id
+
+    def runs(self, domain=None, since=None, until=None, keyword=None, limit=50):
+        """Summaries of stored runs, newest first.
+
+        ``since``/``until`` are Unix timestamps; ``keyword`` matches use-case
+        keywords exactly (case-insensitive).
+        """
+        clauses, params = [], []
+        if domain:
+            clauses.append("runs.domain = ?")
+            params.append(competitor_key(domain))
+        if since is not None:
+            clauses.append("runs.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("runs.created_at < ?")
+            params.append(until)
+        if keyword:
+            clauses.append("""runs.id IN (
+                SELECT use_cases.run_id FROM use_cases
+                JOIN use_case_keywords ON use_case_keywords.use_case_id = use_cases.id
+                WHERE use_case_keywords.keyword = ?)""")
+            params.append(keyword.strip().lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT runs.id, runs.domain, runs.url, runs.entry_point, runs.created_at,
+                       (SELECT COUNT(*) FROM use_cases WHERE use_cases.run_id = runs.id) AS use_case_count
+                FROM runs {where}
+                ORDER BY runs.created_at DESC, runs.id DESC
+                LIMIT ?
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, run_id):
+        """The full structured result of one run, or None."""
+        with self._lock:
+            run = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if run is None:
+                return None
+            competitors = self._conn.execute(
+                "SELECT name, details FROM competitors WHERE run_id = ? ORDER BY position", (run_id,)
+            ).fetchall()
+            use_case_rows = self._conn.execute(
+                "SELECT * FROM use_cases WHERE run_id = ? ORDER BY position", (run_id,)
+            ).fetchall()
+            link_rows = self._conn.execute(
+                """
+                SELECT dataset_links.use_case_id, dataset_links.kind, dataset_links.url
+                FROM dataset_links JOIN use_cases ON use_cases.id = dataset_links.use_case_id
+                WHERE use_cases.run_id = ?
+                ORDER BY dataset_links.rowid
+                """,
+                (run_id,)
+            ).fetchall()
+
+        links_by_use_case = {}
+        for use_case_id, kind, url in link_rows:
+            links_by_use_case.setdefault(use_case_id, {}).setdefault(kind, []).append(url)
+
+        competitor_analysis = json.loads(run["market_analysis"])
+        competitor_analysis["competitors"] = {name: json.loads(details) for name, details in competitors}
+        use_cases = []
+        dataset_links = {}
+        for row in use_case_rows:
+            use_cases.append({
+                "title": row["title"],
+                "objective": row["objective"],
+                "application": row["application"],
+                "benefits": json.loads(row["benefits"]),
+                "keywords": row["keywords"],
+            })
+            links = {"github_links": [], "kaggle_links": [], "huggingface_links": []}
+            links.update(links_by_use_case.get(row["id"], {}))
+            dataset_links[row["title"]] = links
+
+        return {
+            "id": run["id"],
+            "domain": run["domain"],
+            "url": run["url"],
+            "entry_point": run["entry_point"],
+            "created_at": run["created_at"],
+            "company_analysis": json.loads(run["company_analysis"]),
+            "competitor_analysis": competitor_analysis,
+            "use_cases": use_cases,
+            "dataset_links": dataset_links,
+        }
+
+    def latest(self, domain):
+        runs = self.runs(domain=domain, limit=1)
+        return self.get(runs[0]["id"]) if runs else None
+
+    def search_use_cases(self, keyword, domain=None, limit=100):
+        """Use cases tagged with ``keyword``, newest run first, with their run id and domain."""
+        params = [keyword.strip().lower()]
+        domain_clause = ""
+        if domain:
+            domain_clause = "AND runs.domain = ?"
+            params.append(competitor_key(domain))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT runs.id AS run_id, runs.domain, runs.created_at, use_cases.title,
+                       use_cases.objective, use_cases.keywords
+                FROM use_case_keywords
+                JOIN use_cases ON use_cases.id = use_case_keywords.use_case_id
+                JOIN runs ON runs.id = use_cases.run_id
+                WHERE use_case_keywords.keyword = ? {domain_clause}
+                ORDER BY runs.created_at DESC, use_cases.position
+                LIMIT ?
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def render_pdfs(self, run_id, pdf_generator=None):
+        """Rebuild a run's two reports from the stored results, without any network or LLM call."""
+        run = self.get(run_id)
+        if run is None:
+            raise KeyError(f"No stored analysis with id {run_id}")
+        if pdf_generator is None:
+            # Imported here: website_analyzer imports this module
+            from website_analyzer import PDFGenerator
+            pdf_generator = PDFGenerator()
+        return {
+            "company_analysis.pdf": pdf_generator.create_company_analysis_pdf(
+                run["company_analysis"], run["competitor_analysis"]
+            ),
+            "use_cases.pdf": pdf_generator.create_use_cases_pdf(run["use_cases"], run["dataset_links"]),
+        }
+
+    def export_parquet(self, directory):
+        """Write every table to ``directory`` as Parquet files (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from None
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for table in ("runs", "competitors", "use_cases", "use_case_keywords", "dataset_links"):
+            with self._lock:
+                cursor = self._conn.execute(f"SELECT * FROM {table}")
+                columns = [description[0] for description in cursor.description]
+                rows = cursor.fetchall()
+            data = {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+            path = os.path.join(directory, f"{table}.parquet")
+            pq.write_table(pa.table(data), path)
+            paths.append(path)
+        return paths
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query stored analyses and rebuild their reports offline")
+    parser.add_argument("--db", default=".cache/results.sqlite", help="Results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List stored runs, newest first")
+    list_parser.add_argument("--domain")
+    list_parser.add_argument("--keyword")
+    list_parser.add_argument("--since", help="UTC date or datetime, e.g. 2024-05-01")
+    list_parser.add_argument("--until", help="UTC date or datetime")
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    show_parser = commands.add_parser("show", help="Print one run as JSON")
+    show_parser.add_argument("run_id", type=int)
+
+    search_parser = commands.add_parser("search", help="Find use cases by keyword")
+    search_parser.add_argument("keyword")
+    search_parser.add_argument("--domain")
+
+    pdf_parser = commands.add_parser("pdf", help="Rebuild a run's PDF reports")
+    pdf_parser.add_argument("run_id", type=int)
+    pdf_parser.add_argument("-o", "--output-dir", default=".")
+
+    export_parser = commands.add_parser("export", help="Export all tables as Parquet")
+    export_parser.add_argument("directory")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"No results database at {args.db}", file=sys.stderr)
+        return 1
+    store = AnalysisStore(args.db)
+    try:
+        if args.command == "list":
+            for run in store.runs(args.domain, _timestamp(args.since), _timestamp(args.until), args.keyword, args.limit):
+                created = datetime.fromtimestamp(run["created_at"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+                print(f"{run['id']:6} {created} {run['domain']:30} {run['use_case_count']:3} use cases  {run['entry_point']}")
+        elif args.command == "show":
+            run = store.get(args.run_id)
+            if run is None:
+                print(f"No stored analysis with id {args.run_id}", file=sys.stderr)
+                return 1
+            print(json.dumps(run, indent=2, ensure_ascii=False))
+        elif args.command == "search":
+            for match in store.search_use_cases(args.keyword, args.domain):
+                print(f"{match['run_id']:6} {match['domain']:30} {match['title']}")
+        elif args.command == "pdf":
+            os.makedirs(args.output_dir, exist_ok=True)
+            for filename, pdf_bytes in store.render_pdfs(args.run_id).items():
+                path = os.path.join(args.output_dir, f"{args.run_id}-{filename}")
+                with open(path, "wb") as f:
+                    f.write(pdf_bytes)
+                print(path)
+        elif args.command == "export":
+            for path in store.export_parquet(args.directory):
+                print(path)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
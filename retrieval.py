@@ -0,0 +1,164 @@
+import re
+from collections import OrderedDict
+
+# numpy is imported inside the functions that score passages so importing
+# this module (and website_analyzer) does not load it before the first crawl
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# One query per question of the company-analysis prompt
+ANALYSIS_QUERIES = {
+    "products": "products services offerings solutions platform features pricing plans customers use",
+    "focus_areas": "strategy strategic focus priorities innovation investment research technology growth",
+    "vision": "vision mission goals values purpose future commitment sustainability about us",
+    "industry": "industry market segment sectors clients enterprises partners customers global",
+}
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English prose
+    return max(1, len(text) // 4)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Passage:
+    def __init__(self, url, index, text):
+        self.url = url
+        self.index = index
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+def chunk_pages(pages, words_per_chunk=120):
+    """Split each page into passages of about ``words_per_chunk`` words, on line boundaries."""
+    passages = []
+    for url, text in pages.items():
+        if not text or text.startswith("Failed to fetch content"):
+            continue
+        current, count, index = [], 0, 0
+        for line in text.split("\n"):
+            current.append(line)
+            count += len(line.split())
+            if count >= words_per_chunk:
+                passages.append(Passage(url, index, "\n".join(current)))
+                current, count, index = [], 0, index + 1
+        if current:
+            passages.append(Passage(url, index, "\n".join(current)))
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 over a list of passages, scored with NumPy per query term."""
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+
+        import numpy as np
+
+        postings = {}
+        lengths = np.zeros(len(passages), dtype=np.float64)
+        for doc_id, passage in enumerate(passages):
+            terms = tokenize(passage.text)
+            lengths[doc_id] = len(terms)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf)
+
+        self.lengths = lengths
+        self.avg_length = float(lengths.mean()) if len(passages) else 0.0
+        self.postings = {
+            term: (np.array(doc_ids, dtype=np.int64), np.array(tfs, dtype=np.float64))
+            for term, (doc_ids, tfs) in postings.items()
+        }
+
+    def scores(self, query):
+        import numpy as np
+
+        scores = np.zeros(len(self.passages), dtype=np.float64)
+        if not self.passages:
+            return scores
+        n_docs = len(self.passages)
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(self.avg_length, 1e-9))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs = self.postings[term]
+            idf = np.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[doc_ids])
+        return scores
+
+
+class ContextSelector:
+    """Picks the footer passages most relevant to each analysis question.
+
+    Questions take turns claiming their next-best passage until the token
+    budget is spent; a passage relevant to several questions counts once. The selection is rendered in
+    the same ``URL: ... Content: ...`` layout as the unfiltered crawl output.
+    """
+
+    def __init__(self, token_budget=6000, queries=None, words_per_chunk=120):
+        self.token_budget = token_budget
+        self.queries = queries or ANALYSIS_QUERIES
+        self.words_per_chunk = words_per_chunk
+
+    def select(self, pages):
+        passages = chunk_pages(pages, self.words_per_chunk)
+        if not passages:
+            return []
+        index = BM25Index(passages)
+
+        import numpy as np
+
+        rankings = []
+        for query in self.queries.values():
+            scores = index.scores(query)
+            order = np.argsort(-scores, kind="stable")
+            rankings.append([doc_id for doc_id in order if scores[doc_id] > 0])
+
+        selected = set()
+        used = 0
+        # Round-robin over the questions so every one gets its best passages first
+        positions = [0] * len(rankings)
+        progress = True
+        while progress:
+            progress = False
+            for i, ranking in enumerate(rankings):
+                while positions[i] < len(ranking) and ranking[positions[i]] in selected:
+                    positions[i] += 1
+                if positions[i] >= len(ranking):
+                    continue
+                doc_id = ranking[positions[i]]
+                positions[i] += 1
+                progress = True
+                if used + passages[doc_id].tokens > self.token_budget:
+                    continue
+                selected.add(doc_id)
+                used += passages[doc_id].tokens
+
+        # Fall back to page order when no passage matched any query
+        if not selected:
+            for doc_id, passage in enumerate(passages):
+                if used + passage.tokens > self.token_budget:
+                    break
+                selected.add(doc_id)
+                used += passage.tokens
+
+        return [passages[doc_id] for doc_id in sorted(selected)]
+
+    def build_context(self, pages):
+        grouped = OrderedDict()
+        for passage in self.select(pages):
+            grouped.setdefault(passage.url, []).append(passage.text)
+        context = ""
+        for url, texts in grouped.items():
+            context += f"\n\nURL: {url}\nContent:\n" + "\n...\n".join(texts)
+        return context
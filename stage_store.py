@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def content_hash(value):
+    """Stable hex digest of a string or any JSON-serializable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class StageStore:
+    """SQLite record of each site's footer page hashes and last stage outputs.
+
+    A stage output is stored with the hash of the inputs it was computed
+    from; ``get`` only returns it while those inputs are unchanged, so a
+    re-analysis reruns just the stages downstream of what changed.
+    """
+
+    def __init__(self, path=".cache/stages.sqlite"):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (site, url)
+            );
+            CREATE TABLE IF NOT EXISTS stages (
+                site TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                output_hash TEXT NOT NULL,
+                output TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (site, stage)
+            );
+        """)
+        self._conn.commit()
+
+    def update_pages(self, site, pages):
+        """Store the hash of each page's text and report what changed since the last crawl."""
+        hashes = {url: content_hash(text or "") for url, text in pages.items()}
+        now = time.time()
+        with self._lock:
+            previous = dict(self._conn.execute(
+                "SELECT url, content_hash FROM pages WHERE site = ?", (site,)
+            ).fetchall())
+            self._conn.execute("DELETE FROM pages WHERE site = ?", (site,))
+            self._conn.executemany(
+                "INSERT INTO pages (site, url, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+                [(site, url, digest, now) for url, digest in hashes.items()]
+            )
+            self._conn.commit()
+        return {
+            "added": [url for url in hashes if url not in previous],
+            "changed": [url for url, digest in hashes.items() if url in previous and previous[url] != digest],
+            "removed": [url for url in previous if url not in hashes],
+            "unchanged": sum(previous.get(url) == digest for url, digest in hashes.items()),
+        }
+
+    def get(self, site, stage, input_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT input_hash, output FROM stages WHERE site = ? AND stage = ?", (site, stage)
+            ).fetchone()
+        if row is None or row[0] != input_hash:
+            return None
+        return json.loads(row[1])
+
+    def put(self, site, stage, input_hash, output):
+        serialized = json.dumps(output, ensure_ascii=False)
+        output_hash = content_hash(serialized)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO stages (site, stage, input_hash, output_hash, output, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (site, stage, input_hash, output_hash, serialized, time.time())
+            )
+            self._conn.commit()
+        return output_hash
+
+    def output_hashes(self, site):
+        """Stage name -> hash of its last stored output, for inspecting what a refresh changed."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT stage, output_hash FROM stages WHERE site = ?", (site,)
+            ).fetchall())
+
+    def clear(self, site=None):
+        with self._lock:
+            if site is None:
+                self._conn.execute("DELETE FROM pages")
+                self._conn.execute("DELETE FROM stages")
+            else:
+                self._conn.execute("DELETE FROM pages WHERE site = ?", (site,))
+                self._conn.execute("DELETE FROM stages WHERE site = ?", (site,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
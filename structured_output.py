@@ -0,0 +1,318 @@
+import json
+import re
+
+# Expected shapes of the structured answers: field -> str or [str]
+COMPANY_ANALYSIS_SCHEMA = {
+    "offerings": [str],
+    "focus_areas": [str],
+    "vision_goals": [str],
+    "industry": [str],
+}
+
+COMPETITOR_ANALYSIS_SCHEMA = {
+    "market_trends": [str],
+    "drivers_challenges": [str],
+    "forecasts": [str],
+    "industry_reports": [str],
+    "competitors": [{"name": str, "details": [str]}],
+}
+
+USE_CASE_SCHEMA = {
+    "title": str,
+    "objective": str,
+    "application": str,
+    "benefits": [str],
+    "keywords": [str],
+}
+
+# Marker the prompts end with; also lets test doubles recognise structured prompts
+JSON_ONLY = "Respond with JSON only"
+
+# Patterns are only run on lines whose first character can start a match
+_HEADING_PREFIX_RE = re.compile(r"^(?:#{1,6}\s*|\d+[.)]\s+)")
+_BULLET_RE = re.compile(r"^(?:[-•*]|\d+[.)])\s+")
+_FULL_BOLD_RE = re.compile(r"^\*\*[^*]+\*\*:?$")
+_USE_CASE_PREFIX_RE = re.compile(r"^use case\s*\d*\s*[:.\-]", re.IGNORECASE)
+_PREFIX_CHARS = frozenset("#0123456789")
+_BULLET_CHARS = frozenset("-•*0123456789")
+
+# Section headings of the free-text answers, anchored at the start of the heading
+_COMPANY_SECTIONS = (
+    ("offerings", re.compile(r"^(?:key\s+)?(?:offerings|products)\b", re.IGNORECASE)),
+    ("focus_areas", re.compile(r"^(?:strategic\s+)?focus\b", re.IGNORECASE)),
+    ("vision_goals", re.compile(r"^(?:vision|goals)\b", re.IGNORECASE)),
+    ("industry", re.compile(r"^(?:industry|market\s+segment)\b", re.IGNORECASE)),
+)
+_COMPETITOR_SECTIONS = (
+    ("market_trends", re.compile(r"^(?:overview\b|market\s+trends\b)", re.IGNORECASE)),
+    ("drivers_challenges", re.compile(r"^(?:key\s+)?(?:drivers|challenges)\b", re.IGNORECASE)),
+    ("forecasts", re.compile(r"^(?:market\s+)?(?:forecasts?|growth)\b", re.IGNORECASE)),
+    ("industry_reports", re.compile(r"^(?:industry(?:-specific)?\s+)?(?:reports?|insights)\b", re.IGNORECASE)),
+)
+_USE_CASE_FIELDS = {
+    "objective": "objective",
+    "ai application": "application",
+    "cross-functional benefits": "benefits",
+    "keywords": "keywords",
+}
+
+
+def _example(spec):
+    if isinstance(spec, dict):
+        return {name: _example(value) for name, value in spec.items()}
+    if isinstance(spec, list):
+        return [_example(spec[0])]
+    return "..."
+
+
+def json_instructions(schema, many=False):
+    """Prompt text asking for JSON shaped like ``schema`` (an array of them if ``many``)."""
+    example = json.dumps([_example(schema)] if many else _example(schema), indent=2)
+    shape = "a JSON array of objects" if many else "a single JSON object"
+    return (
+        f"{JSON_ONLY}: {shape} shaped exactly like the example below, "
+        f"with no markdown, comments or text outside the JSON.\n{example}"
+    )
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value.strip()
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(filter(None, map(_text, value)))
+    return str(value).strip()
+
+
+def _items(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def validate(data, schema):
+    """Coerce ``data`` to ``schema`` in one pass over the schema's fields.
+
+    Missing fields become empty, scalars stand in for one-item lists and
+    unknown fields are dropped.
+    """
+    validated = {}
+    for name, spec in schema.items():
+        value = data.get(name)
+        if spec is str:
+            validated[name] = _text(value)
+        elif spec[0] is str:
+            validated[name] = list(filter(None, map(_text, _items(value))))
+        else:
+            validated[name] = [validate(item, spec[0]) for item in _items(value) if isinstance(item, dict)]
+    return validated
+
+
+def load_json(text):
+    """Decode the first JSON object or array in ``text``; None if there is none.
+
+    Text around it, such as a code fence, is ignored.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    try:
+        data, _ = _decoder.raw_decode(text, min(starts))
+    except json.JSONDecodeError:
+        return None
+    return data
+
+
+_decoder = json.JSONDecoder()
+
+
+def _heading(line):
+    """The text of ``line`` if it is formatted as a heading, else None."""
+    first = line[0]
+    if first in "-•" or (first == "*" and not line.startswith("**")):
+        return None
+    if first not in "#*" and first not in _PREFIX_CHARS and not line.endswith(":"):
+        return None
+    stripped = _HEADING_PREFIX_RE.sub("", line) if first in _PREFIX_CHARS else line
+    text = stripped.replace("**", "").strip()
+    is_heading = first == "#" or text.endswith(":") or _FULL_BOLD_RE.match(stripped)
+    if not is_heading or len(text) > 80:
+        return None
+    return text.rstrip(":").strip()
+
+
+def _parse_sections(text, sections, default_section=None):
+    parsed = {name: [] for name, _ in sections}
+    named = {}
+    current = parsed.get(default_section)
+    for raw in text.split("\n"):
+        line = raw.strip()
+        if not line:
+            continue
+        heading = _heading(line)
+        if heading is not None:
+            for name, pattern in sections:
+                if pattern.match(heading):
+                    current = parsed[name]
+                    break
+            else:
+                current = named.setdefault(heading.replace("Company:", "").strip(), [])
+            continue
+        if current is not None:
+            if line[0] in "-•" and line[1:2] == " ":
+                line = line[2:].lstrip()
+            elif line[0] in _BULLET_CHARS:
+                line = _BULLET_RE.sub("", line)
+            current.append(line.replace("**", ""))
+    return parsed, named
+
+
+def parse_company_analysis_markdown(text):
+    """Fallback for free-text company analyses, with headings matched by precompiled patterns."""
+    parsed, _ = _parse_sections(text, _COMPANY_SECTIONS)
+    return parsed
+
+
+def parse_competitor_analysis_markdown(text):
+    """Fallback for free-text competitor analyses; other headings start a competitor."""
+    parsed, competitors = _parse_sections(text, _COMPETITOR_SECTIONS)
+    parsed["competitors"] = {name: details for name, details in competitors.items() if name}
+    return parsed
+
+
+def parse_use_cases_markdown(text):
+    """Fallback for use cases in the ``**Use Case X: ...**`` layout."""
+    use_cases = []
+    current = None
+    for raw in text.split("\n"):
+        line = raw.replace("**", "").strip()
+        if not line:
+            continue
+        numbered = False
+        if line[0] in _PREFIX_CHARS:
+            stripped = _HEADING_PREFIX_RE.sub("", line)
+            numbered, line = stripped != line and line[0] != "#", stripped
+        if line[:8].lower() == "use case":
+            current = {"title": line, "objective": "", "application": "", "benefits": [], "keywords": ""}
+            use_cases.append(current)
+            continue
+        if current is None:
+            continue
+        if line[0] in "-•*":
+            current["benefits"].append(line[1:].strip())
+            continue
+        name, colon, value = line.partition(":")
+        field = _USE_CASE_FIELDS.get(name.strip().lower()) if colon else None
+        if field is not None:
+            if field != "benefits":
+                current[field] = value.strip()
+        elif numbered:
+            current["benefits"].append(line)
+    return use_cases
+
+
+def parse_company_analysis(text):
+    data = load_json(text)
+    if isinstance(data, dict):
+        return validate(data, COMPANY_ANALYSIS_SCHEMA)
+    return parse_company_analysis_markdown(text)
+
+
+def parse_competitor_analysis(text):
+    data = load_json(text)
+    if not isinstance(data, dict):
+        return parse_competitor_analysis_markdown(text)
+    analysis = validate(data, COMPETITOR_ANALYSIS_SCHEMA)
+    # Same shape as the markdown parsers produce: company name -> details
+    analysis["competitors"] = {
+        competitor["name"]: competitor["details"] for competitor in analysis["competitors"] if competitor["name"]
+    }
+    return analysis
+
+
+def _use_case(data, number):
+    use_case = validate(data, USE_CASE_SCHEMA)
+    if not use_case["title"]:
+        return None
+    # Same comma-separated string as the markdown layout's Keywords line
+    use_case["keywords"] = ", ".join(use_case["keywords"])
+    if not _USE_CASE_PREFIX_RE.match(use_case["title"]):
+        use_case["title"] = f"Use Case {number}: {use_case['title']}"
+    return use_case
+
+
+def parse_use_cases(text, start=1):
+    """Use cases from a JSON answer, or from the markdown layout when it is not JSON.
+
+    Titles without a ``Use Case N:`` prefix are numbered from ``start``.
+    """
+    data = load_json(text)
+    if isinstance(data, dict):
+        data = data.get("use_cases", [data])
+    if not isinstance(data, list):
+        return parse_use_cases_markdown(text)
+    use_cases = []
+    for item in data:
+        use_case = _use_case(item, start + len(use_cases)) if isinstance(item, dict) else None
+        if use_case is not None:
+            use_cases.append(use_case)
+    return use_cases
+
+
+def use_case_keywords(use_cases):
+    """Map each use case title to its keyword list, like WebsiteAnalyzer.extract_use_cases."""
+    return {
+        use_case["title"]: [keyword.strip() for keyword in use_case["keywords"].split(",") if keyword.strip()]
+        for use_case in use_cases
+    }
+
+
+class JSONUseCaseStreamParser:
+    """Incremental counterpart of ``parse_use_cases`` for a streamed JSON array.
+
+    Each object is decoded and validated as soon as its closing brace
+    arrives, so use cases can be shown (and their dataset lookups started)
+    while the rest of the array is still streaming. Anything left over at the
+    end, including answers that are not JSON at all, goes through
+    ``parse_use_cases``.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._count = 0
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if "}" not in chunk:
+            return []
+        completed = []
+        while True:
+            start = self._buffer.find("{", self._pos)
+            if start < 0:
+                break
+            try:
+                data, end = _decoder.raw_decode(self._buffer, start)
+            except json.JSONDecodeError:
+                break
+            # Drop what has been decoded so the buffer stays about one object long
+            self._buffer, self._pos = self._buffer[end:], 0
+            if not isinstance(data, dict):
+                continue
+            # A {"use_cases": [...]} wrapper only decodes once it is complete
+            for item in data["use_cases"] if isinstance(data.get("use_cases"), list) else [data]:
+                use_case = _use_case(item, self._count + 1) if isinstance(item, dict) else None
+                if use_case is not None:
+                    self._count += 1
+                    completed.append(use_case)
+        return completed
+
+    def finish(self):
+        rest = self._buffer[self._pos:]
+        self._buffer, self._pos = "", 0
+        if not rest.strip(" \t\r\n,]`"):
+            return []
+        completed = parse_use_cases(rest, start=self._count + 1)
+        self._count += len(completed)
+        return completed
@@ -0,0 +1,279 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The trace of the analysis running in this context and the stage it is in.
+# StagePipeline and the crawler copy the context into their worker threads.
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_stage = contextvars.ContextVar("current_stage", default="analysis")
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+COUNTERS = (
+    "http_requests", "http_bytes",
+    "llm_calls", "llm_prompt_chars", "llm_completion_chars",
+    "cache_hits", "cache_misses", "pdf_bytes", "retries", "stage_reuses",
+    "llm_seconds", "llm_cost_usd", "llm_fallbacks", "llm_timeouts",
+    "pages_unchanged", "pages_changed", "pages_added", "pages_removed",
+)
+
+
+class Span:
+    def __init__(self, name, stage, start):
+        self.name = name
+        self.stage = stage
+        self.start = start
+        self.end = None
+        self.attributes = {}
+
+    @property
+    def duration(self):
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self, origin):
+        return {
+            "name": self.name,
+            "stage": self.stage,
+            "start_offset_seconds": round(self.start - origin, 6),
+            "duration_seconds": None if self.end is None else round(self.duration, 6),
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """Spans and per-stage counters collected during one analysis."""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.finished_at = None
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, counter, value=1, provider=None):
+        key = counter if provider is None else f"{counter}:{provider}"
+        with self._lock:
+            stage_counters = self.counters.setdefault(stage, {})
+            stage_counters[key] = stage_counters.get(key, 0) + value
+
+    def start_span(self, name, stage):
+        span = Span(name, stage, time.perf_counter())
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def finish(self):
+        self.finished_at = time.time()
+        metrics.observe(self)
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self._origin if self.finished_at is None else self.finished_at - self.started_at
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "attributes": self.attributes,
+                "started_at": self.started_at,
+                "duration_seconds": round(self.duration, 6),
+                "spans": [span.to_dict(self._origin) for span in self.spans],
+                "counters": {stage: dict(values) for stage, values in self.counters.items()},
+            }
+
+    def write_json(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-." else "_" for c in self.name)
+        path = os.path.join(directory, f"{safe_name}-{int(self.started_at)}-{uuid.uuid4().hex[:8]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+@contextmanager
+def activate(trace):
+    """Make ``trace`` the current trace for this context."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name, stage=None, **attributes):
+    """Time a block as a span; counters recorded inside it are filed under ``stage``."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    stage = stage or name
+    current = trace.start_span(name, stage)
+    current.attributes.update(attributes)
+    token = _current_stage.set(stage)
+    span_token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(span_token)
+        _current_stage.reset(token)
+
+
+def current_stage():
+    return _current_stage.get()
+
+
+def annotate(**attributes):
+    """Add attributes to the innermost open span; a no-op outside a trace."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record(counter, value=1, provider=None):
+    """Add to a counter of the current stage; a no-op outside a trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(_current_stage.get(), counter, value, provider)
+
+
+def record_http(provider, num_bytes):
+    record("http_requests", 1, provider)
+    record("http_bytes", num_bytes, provider)
+
+
+def record_cache(provider, hit):
+    record("cache_hits" if hit else "cache_misses", 1, provider)
+
+
+class TracedLLM:
+    """Records call count and prompt/completion sizes of the wrapped model."""
+
+    def __init__(self, llm, provider="gemini"):
+        self.llm = llm
+        self.provider = provider
+
+    def invoke(self, prompt, **kwargs):
+        with span(f"llm:{self.provider}", stage=current_stage()):
+            response = self.llm.invoke(prompt, **kwargs)
+        record("llm_calls", 1, self.provider)
+        record("llm_prompt_chars", len(str(prompt)), self.provider)
+        record("llm_completion_chars", len(response.content), self.provider)
+        return response
+
+    def stream(self, prompt, **kwargs):
+        completion = 0
+        for chunk in self.llm.stream(prompt, **kwargs):
+            completion += len(chunk.content)
+            yield chunk
+        record("llm_calls", 1, self.provider)
+        record("llm_prompt_chars", len(str(prompt)), self.provider)
+        record("llm_completion_chars", completion, self.provider)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class MetricsRegistry:
+    """Aggregates finished traces into Prometheus-style histograms and counters."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}  # stage -> [bucket counts..., +Inf count, sum]
+        self._counters = {}    # (stage, counter, provider) -> value
+        self._lock = threading.Lock()
+
+    def _observe_latency(self, stage, seconds):
+        histogram = self._histograms.setdefault(stage, [0] * (len(self.buckets) + 1) + [0.0])
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def observe(self, trace):
+        with self._lock:
+            self._observe_latency("analysis", trace.duration)
+            for span in trace.spans:
+                if span.duration is not None and span.name == span.stage:
+                    self._observe_latency(span.stage, span.duration)
+            for stage, values in trace.counters.items():
+                for key, value in values.items():
+                    counter, _, provider = key.partition(":")
+                    series = (stage, counter, provider)
+                    self._counters[series] = self._counters.get(series, 0) + value
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP analyzer_stage_duration_seconds Wall-clock time of analysis stages.",
+            "# TYPE analyzer_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram):
+                    cumulative += count
+                    lines.append(f'analyzer_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                cumulative += histogram[len(self.buckets)]
+                lines.append(f'analyzer_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+                lines.append(f'analyzer_stage_duration_seconds_sum{{stage="{stage}"}} {histogram[-1]:.6f}')
+                lines.append(f'analyzer_stage_duration_seconds_count{{stage="{stage}"}} {cumulative}')
+
+            for counter in COUNTERS:
+                series = [(key, value) for key, value in self._counters.items() if key[1] == counter]
+                if not series:
+                    continue
+                lines.append(f"# TYPE analyzer_{counter}_total counter")
+                for (stage, _, provider), value in sorted(series):
+                    labels = f'stage="{stage}"' + (f',provider="{provider}"' if provider else "")
+                    lines.append(f"analyzer_{counter}_total{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so a scraper never sees a half-written file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+
+metrics = MetricsRegistry()
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve ``metrics.render_prometheus()`` at /metrics from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
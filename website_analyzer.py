@@ -1,18 +1,39 @@
-import requests
-from bs4 import BeautifulSoup
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tavily import TavilyClient
-import ast
-import re
-import json
+from crawler import CrawlReport, FooterCrawler
+from http_cache import DiskHTTPCache
+from link_planner import footer_links, plan_footer_links
+from llm_cache import CachedLLM, SQLiteLLMCache
+from model_routing import MODEL_TIERS, ModelRouter
+from pipeline import PipelineCancelled, StagePipeline
+from dataset_search import DatasetLinkSearcher
+from competitors import competitor_discovery, competitor_key
+from retrieval import ContextSelector
+from rate_limit import RateLimitedLLM
+from rendering import ReportRenderer
+from result_cache import normalize_site_url
+from results_store import AnalysisStore
+from stage_store import StageStore, content_hash
+import structured_output
+from structured_output import COMPANY_ANALYSIS_SCHEMA, COMPETITOR_ANALYSIS_SCHEMA, USE_CASE_SCHEMA, JSONUseCaseStreamParser
+import tracing
+from tracing import Trace, TracedLLM
 import re
+import io
+import logging
 import os
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+# LangChain's Gemini client, Tavily and ReportLab are imported on first use:
+# together they account for most of the module's import time, which every
+# Streamlit cold start and batch worker would otherwise pay up front.
+
+# Set for the duration of a forced refresh; copied into pipeline and site workers
+# with the rest of the context so no stored stage output is reused
+_refreshing = contextvars.ContextVar("refreshing", default=False)
+
+logger = logging.getLogger(__name__)
 
 class TextCleaner:
     @staticmethod
@@ -162,16 +183,65 @@ class TextCleaner:
             sections[current_section] = current_text
             
         return sections
-class PDFGenerator:
+
+class UseCaseStreamParser:
+    """Incrementally parses a streamed use-case response.
+
+    ``feed`` returns the use cases completed by a chunk; a use case is complete
+    once its Keywords line has been fully received.
+    """
+
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
+        self._buffer = ""
+        self._block = []
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            self._block.append(line)
+            if re.sub(r'\*\*([^*]+)\*\*', r'\1', line).strip().startswith("Keywords:"):
+                completed.extend(self._flush())
+        return completed
+
+    def finish(self):
+        if self._buffer:
+            self._block.append(self._buffer)
+            self._buffer = ""
+        return self._flush()
+
+    def _flush(self):
+        text = "\n".join(self._block)
+        self._block = []
+        return [use_case for use_case in TextCleaner.clean_markdown(text) if "title" in use_case]
+
+
+class PDFGenerator:
+    # The style sheet is only read while rendering, so one copy per process is
+    # shared; it is built on first use so ReportLab is not imported before then
+    _shared_styles = None
+    _styles_lock = threading.Lock()
+
+    @property
+    def styles(self):
+        if PDFGenerator._shared_styles is None:
+            with PDFGenerator._styles_lock:
+                if PDFGenerator._shared_styles is None:
+                    from reportlab.lib.styles import getSampleStyleSheet
+                    styles = getSampleStyleSheet()
+                    self._create_custom_styles(styles)
+                    PDFGenerator._shared_styles = styles
+        return PDFGenerator._shared_styles
+
+    def _create_custom_styles(self, styles):
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle
 
-    def _create_custom_styles(self):
         # Main heading style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='MainHeading',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=20,
             spaceAfter=30,
             textColor=colors.HexColor('#1B4F72'),
@@ -179,9 +249,9 @@ class PDFGenerator:
         ))
         
         # Use case title style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='UseCaseTitle',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=16,
             spaceAfter=15,
             textColor=colors.HexColor('#2874A6'),
@@ -189,9 +259,9 @@ class PDFGenerator:
         ))
         
         # Section heading style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='SectionHeading',
-            parent=self.styles['Heading3'],
+            parent=styles['Heading3'],
             fontSize=12,
             spaceAfter=10,
             textColor=colors.HexColor('#2E86C1'),
@@ -200,9 +270,9 @@ class PDFGenerator:
         
         
         # Benefit text style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='BenefitText',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=6,
             leftIndent=20,
@@ -210,43 +280,56 @@ class PDFGenerator:
         ))
         
         # Keywords style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='Keywords',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=20,
             textColor=colors.HexColor('#566573'),
             leading=14
         ))
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='AnalysisSection',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=14,
             spaceAfter=12,
             textColor=colors.HexColor('#2874A6'),
             leading=18
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CompanyName',
-            parent=self.styles['Heading3'],
+            parent=styles['Heading3'],
             fontSize=12,
             spaceAfter=8,
             textColor=colors.HexColor('#566573'),
             leading=16
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='AnalysisList',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
             spaceAfter=6,
             leftIndent=20,
             leading=14
         ))
 
-    def create_company_analysis_pdf(self, company_analysis, competitor_analysis, filename="company_analysis.pdf"):
-        doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        # Comparison table cells
+        styles.add(ParagraphStyle(
+            name='ComparisonCell',
+            parent=styles['Normal'],
+            fontSize=8,
+            leading=10
+        ))
+
+    def create_company_analysis_pdf(self, company_analysis, competitor_analysis, filename=None):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+        # Render into memory unless a filename is given, so concurrent sessions never share files
+        output = filename or io.BytesIO()
+        doc = SimpleDocTemplate(output, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
         story = []
         
         # Company Analysis Section
@@ -321,9 +404,72 @@ class PDFGenerator:
                 story.append(Paragraph(f"• {report}", self.styles['AnalysisList']))
         
         doc.build(story)
+        return None if filename else output.getvalue()
+
+    def create_comparison_pdf(self, sites, filename=None, max_items=6):
+        """Side-by-side table of each site's company analysis, one column per site.
+
+        A cell keeps at most ``max_items`` points of a section and as much text
+        as its column width allows, so every row fits on one page.
+        """
+        from xml.sax.saxutils import escape
+
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+        output = filename or io.BytesIO()
+        pagesize = landscape(A4)
+        doc = SimpleDocTemplate(output, pagesize=pagesize, rightMargin=36, leftMargin=36, topMargin=48, bottomMargin=48)
+        cell = self.styles['ComparisonCell']
+        story = [Paragraph("Competitive Comparison", self.styles['MainHeading'])]
+
+        label_width = 80
+        site_width = (pagesize[0] - doc.leftMargin - doc.rightMargin - label_width) / max(1, len(sites))
+        # About 4.4pt per character at 8pt and 30 lines per cell leave room for the header row and wrapping
+        budget = int((site_width - 12) / 4.4) * 30
+
+        def points(value):
+            items = [value] if isinstance(value, str) else list(value or [])
+            kept, left = [], budget
+            for item in filter(None, items[:max_items]):
+                if left <= 0:
+                    break
+                kept.append(item if len(item) <= left else item[:left].rstrip() + "…")
+                left -= len(item) + 20
+            return Paragraph("<br/>".join(f"• {escape(item)}" for item in kept) or "–", cell)
 
-    def create_use_cases_pdf(self, use_cases_data, dataset_links, filename="use_cases.pdf"):
-        doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        sections = (("Key offerings", "offerings"), ("Strategic focus", "focus_areas"),
+                    ("Vision and goals", "vision_goals"), ("Industry", "industry"))
+        rows = [[Paragraph("<b>Site</b>", cell)] + [Paragraph(f"<b>{escape(site['domain'])}</b>", cell) for site in sites]]
+        for label, key in sections:
+            row = [Paragraph(f"<b>{label}</b>", cell)]
+            for site in sites:
+                if "error" in site:
+                    row.append(Paragraph(f"<i>Unavailable: {escape(site['error'][:budget])}</i>", cell))
+                else:
+                    row.append(points(site["company_analysis"].get(key)))
+            rows.append(row)
+
+        table = Table(rows, colWidths=[label_width] + [site_width] * len(sites), repeatRows=1)
+        table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#AEB6BF')),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D6EAF8')),
+            # The analyzed site is the shaded first column
+            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#EBF5FB')),
+        ]))
+        story.append(table)
+
+        doc.build(story)
+        return None if filename else output.getvalue()
+
+    def create_use_cases_pdf(self, use_cases_data, dataset_links, filename=None):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+        output = filename or io.BytesIO()
+        doc = SimpleDocTemplate(output, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
         story = []
         
         # Main heading
@@ -370,79 +516,393 @@ class PDFGenerator:
             story.append(Spacer(1, 20))
         
         doc.build(story)
+        return None if filename else output.getvalue()
+
+class LazyChatModel:
+    """Creates the Gemini chat model on its first call rather than at start-up."""
+
+    def __init__(self, model):
+        self.model = model
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    self._llm = ChatGoogleGenerativeAI(model=self.model)
+        return self._llm
+
+    def invoke(self, prompt, **kwargs):
+        return self._get().invoke(prompt, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        return self._get().stream(prompt, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
 
 class WebsiteAnalyzer:
-    def __init__(self, tavily_api_key, serper_api_key, google_api_key):
-        self.tavily_client = TavilyClient(api_key=tavily_api_key)
+    def __init__(self, tavily_api_key, serper_api_key, google_api_key,
+                 crawl_workers=16, crawl_per_host=4, crawl_max_pages=40, fetch_timeout=(5, 15),
+                 max_page_bytes=2 * 1024 * 1024, http_cache_path=".cache/http.sqlite",
+                 llm_cache_path=".cache/llm.sqlite", context_token_budget=6000, render_processes=0,
+                 trace_dir=None, json_output=False, stage_store_path=".cache/stages.sqlite",
+                 results_store_path=".cache/results.sqlite", model_tiers=None, model_routes=None):
+        self.tavily_api_key = tavily_api_key
+        self._tavily_client = None
         self.serper_api_key = serper_api_key
         os.environ["GOOGLE_API_KEY"] = google_api_key
-        self.llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro")
+        # One client per model tier; model_routes picks the tier, timeout and fallbacks of each LLM stage
+        tiers = {**MODEL_TIERS, **(model_tiers or {})}
+        llm_cache = SQLiteLLMCache(llm_cache_path) if llm_cache_path else None
+        llms = {}
+        for tier, config in tiers.items():
+            llm = TracedLLM(RateLimitedLLM(LazyChatModel(config["model"]), provider=config["provider"]),
+                            provider=config["provider"])
+            llms[tier] = CachedLLM(llm, llm_cache, model_name=config["model"]) if llm_cache else llm
+        self.models = ModelRouter(llms, {tier: config["model"] for tier, config in tiers.items()}, model_routes)
         self.pdf_generator = PDFGenerator()
+        # render_processes > 0 builds the two PDFs in parallel worker processes
+        self.report_renderer = ReportRenderer(self.pdf_generator, processes=render_processes)
+        # When set, every analysis writes its JSON trace into this directory
+        self.trace_dir = trace_dir
         self.text_cleaner = TextCleaner()
+        # Ask the LLM for JSON and validate it instead of parsing markdown with TextCleaner
+        self.json_output = json_output
+        # Pass http_cache_path=None to always fetch pages from the network
+        self.http_cache = DiskHTTPCache(http_cache_path) if http_cache_path else None
+        self.crawler = FooterCrawler(
+            max_workers=crawl_workers, max_per_host=crawl_per_host, cache=self.http_cache,
+            timeout=fetch_timeout, max_bytes=max_page_bytes, max_pages=crawl_max_pages
+        )
+        self.dataset_searcher = DatasetLinkSearcher(serper_api_key)
+        # Pass context_token_budget=None to send the full footer text to the LLM
+        self.context_selector = ContextSelector(context_token_budget) if context_token_budget else None
+        # Page hashes and stage outputs of the last analysis of each site; None disables reuse
+        self.stage_store = StageStore(stage_store_path) if stage_store_path else None
+        # Structured archive of every finished analysis; None disables it
+        self.results_store = AnalysisStore(results_store_path) if results_store_path else None
 
 
 
-    def analyze_and_generate_pdfs(self, website_url):
-        footer_content = self.get_footer_content(website_url)
-        company_analysis_raw = self.llm.invoke(self._generate_company_analysis_prompt(footer_content, [])).content
-        _, competitor_analysis_raw = self.get_competitor_analysis(website_url)
-        
-        # Call static methods directly using the class name
-        company_analysis = TextCleaner.clean_company_analysis(company_analysis_raw)  # Changed
-        competitor_analysis = TextCleaner.clean_competitor_analysis(competitor_analysis_raw)  # Changed
-        
-        # Get use cases and clean the output
-        use_cases_response = self.llm.invoke(self._generate_use_cases_prompt(company_analysis_raw, competitor_analysis_raw))
-        use_cases_data = TextCleaner.clean_markdown(use_cases_response.content)  # Changed
+    @property
+    def tavily_client(self):
+        if self._tavily_client is None:
+            from tavily import TavilyClient
+            self._tavily_client = TavilyClient(api_key=self.tavily_api_key)
+        return self._tavily_client
 
-        
-       
-        
-        # Get dataset links
-        use_case_links = {}
-        for use_case in use_cases_data:
-            keywords = use_case.get('keywords', '').split(', ')
-            keywords_str = " ".join(keywords)
-            dataset_links = self.get_dataset_links(keywords_str)
-            use_case_links[use_case['title']] = dataset_links
-        
-        # Generate PDFs
-        self.pdf_generator.create_company_analysis_pdf(company_analysis, competitor_analysis)
-        self.pdf_generator.create_use_cases_pdf(use_cases_data, use_case_links)
-        
-        return "PDFs generated successfully: company_analysis.pdf and use_cases.pdf"
+    @tavily_client.setter
+    def tavily_client(self, client):
+        self._tavily_client = client
 
+    @contextmanager
+    def _refresh(self, refresh):
+        """Skip cached LLM answers and stored stage outputs for this run when a fresh analysis is requested."""
+        if not refresh:
+            yield
+            return
+        cached = [llm for llm in self.models.llms.values() if isinstance(llm, CachedLLM)]
+        token = _refreshing.set(True)
+        try:
+            # The bypass flag is shared by every cached tier
+            with cached[0].bypass_cache() if cached else nullcontext():
+                yield
+        finally:
+            _refreshing.reset(token)
 
-    def get_footer_content(self, website_url):
+    def _incremental(self, website_url, stage, inputs, compute, enabled=True):
+        """Reuse ``stage``'s output from the site's last analysis if ``inputs`` are unchanged.
+
+        During a forced refresh the stored output is ignored but the fresh one
+        is still stored for the next analysis.
+        """
+        if self.stage_store is None or not enabled:
+            return compute()
+        site = normalize_site_url(website_url)
+        input_hash = content_hash(inputs)
+        if not _refreshing.get():
+            output = self.stage_store.get(site, stage, input_hash)
+            if output is not None:
+                tracing.record("stage_reuses")
+                return output
+        output = compute()
+        self.stage_store.put(site, stage, input_hash, output)
+        return output
+
+    def _generate(self, website_url, stage, route, prompt, incremental=True):
+        """Answer ``prompt`` with the models ``route`` names, reusing the site's last answer if neither changed."""
+        inputs = {"models": self.models.route_key(route), "prompt": prompt}
+        return self._incremental(website_url, stage, inputs,
+                                 lambda: self.models.invoke(route, prompt).content, incremental)
+
+    def _track_pages(self, website_url, footer_content):
+        if self.stage_store is None:
+            return
+        changes = self.stage_store.update_pages(normalize_site_url(website_url), footer_content)
+        tracing.record("pages_unchanged", changes["unchanged"])
+        for change in ("changed", "added", "removed"):
+            tracing.record(f"pages_{change}", len(changes[change]))
+
+    def _save_results(self, website_url, entry_point, company_analysis, competitor_analysis, use_cases, dataset_links):
+        """Archive a finished analysis in the results store; returns its run id."""
+        if self.results_store is None:
+            return None
+        # analyze_website keys the links by the title without its "Use Case N:" prefix
+        links = {}
+        for use_case in use_cases:
+            title = use_case.get("title", "")
+            links[title] = dataset_links.get(title) or dataset_links.get(title.partition(":")[2].strip(), {})
         try:
-            response = requests.get(website_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-            
-            footer = soup.find("footer")
-            if not footer:
-                return None
+            return self.results_store.save(website_url, entry_point, company_analysis, competitor_analysis,
+                                           use_cases, links)
+        except Exception as e:
+            print(f"Error saving analysis results: {str(e)}")
+            return None
 
-            links = footer.find_all("a", href=True)
-            footer_links = [{"text": link.get_text(strip=True), "url": link["href"]} for link in links]
-            
-            footer_content = {}
-            for link in footer_links:
-                url = link["url"]
-                full_url = requests.compat.urljoin(website_url, url)
-                try:
-                    link_response = requests.get(full_url)
-                    link_response.raise_for_status()
-                    link_soup = BeautifulSoup(link_response.content, "html.parser")
-                    page_text = link_soup.get_text(separator="\n", strip=True)
-                    footer_content[full_url] = page_text
-                except Exception as e:
-                    footer_content[full_url] = f"Failed to fetch content: {str(e)}"
+    @contextmanager
+    def _traced(self, name, website_url, trace=None):
+        trace = trace or Trace(name=competitor_key(website_url), entry_point=name, url=website_url)
+        try:
+            with tracing.activate(trace):
+                yield trace
+        finally:
+            trace.finish()
+            if self.trace_dir:
+                trace.write_json(self.trace_dir)
+
+    def analyze_and_generate_pdfs(self, website_url, refresh=False, on_use_case=None, on_stage=None, cancel_event=None,
+                                  trace=None, incremental=True, compare=False, max_competitors=5):
+        """Run the analysis and render both reports.
+
+        With ``incremental`` (and a stage store), LLM stages whose prompt and
+        routed models match the site's previous analysis reuse that output, so only
+        stages downstream of changed footer pages or competitors rerun. With
+        ``compare``, up to ``max_competitors`` competitor websites are crawled
+        and summarized alongside and a third, side-by-side report is added.
+        """
+        pipeline = StagePipeline()
+
+        # Footer crawl -> company analysis and the competitor lookup run side by side
+        pipeline.add_stage("footer_content", lambda: self.get_footer_context(website_url))
+
+        def company_analysis_raw(footer_content):
+            prompt = self._generate_company_analysis_prompt(footer_content, [])
+            return self._generate(website_url, "pdfs:company_analysis", "company_analysis", prompt, incremental)
+
+        def competitor_analysis_raw():
+            prompt = self._generate_competitor_analysis_prompt(self.get_competitors(website_url))
+            return self._generate(website_url, "pdfs:competitor_analysis", "competitor_analysis", prompt, incremental)
+
+        # Use case generation starts as soon as both analyses are ready; each use
+        # case's dataset lookup starts as soon as that use case has streamed in
+        def generate_use_cases(company_analysis_raw, competitor_analysis_raw):
+            use_cases_data = []
+            link_futures = {}
+            for use_case, links_future in self.stream_use_cases(company_analysis_raw, competitor_analysis_raw):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PipelineCancelled()
+                use_cases_data.append(use_case)
+                link_futures[use_case['title']] = links_future
+                if on_use_case is not None:
+                    on_use_case(use_case)
+            # Lookups overlap with generation; report whatever is still outstanding
+            if on_stage is not None:
+                on_stage("dataset_links", "running")
+            use_case_links = {title: future.result() for title, future in link_futures.items()}
+            if on_stage is not None:
+                on_stage("dataset_links", "done")
+            return use_cases_data, use_case_links
+
+        def use_cases(company_analysis_raw, competitor_analysis_raw):
+            prompt = self._generate_use_cases_prompt(company_analysis_raw, competitor_analysis_raw)
+            generated = []
+
+            def generate():
+                generated.append(True)
+                return generate_use_cases(company_analysis_raw, competitor_analysis_raw)
+
+            inputs = {"models": self.models.route_key("use_cases"), "prompt": prompt}
+            use_cases_data, use_case_links = self._incremental(website_url, "pdfs:use_cases", inputs, generate, incremental)
+            if not generated:
+                # Reused from the site's last analysis: replay the use cases for the progress view
+                if on_use_case is not None:
+                    for use_case in use_cases_data:
+                        on_use_case(use_case)
+                if on_stage is not None:
+                    on_stage("dataset_links", "done")
+            return use_cases_data, use_case_links
 
+        # The company report does not need the use cases, so it renders while they are generated
+        def company_pdf(company_analysis_raw, competitor_analysis_raw):
+            company_analysis = self.parse_company_analysis(company_analysis_raw)
+            competitor_analysis = self.parse_competitor_analysis(competitor_analysis_raw)
+            pdf_bytes, _ = self.report_renderer.render("create_company_analysis_pdf", company_analysis, competitor_analysis)
+            return pdf_bytes
+
+        def use_cases_pdf(use_cases):
+            use_cases_data, use_case_links = use_cases
+            pdf_bytes, _ = self.report_renderer.render("create_use_cases_pdf", use_cases_data, use_case_links)
+            return pdf_bytes
+
+        pipeline.add_stage("company_analysis_raw", company_analysis_raw, depends_on=["footer_content"])
+        pipeline.add_stage("competitor_analysis_raw", competitor_analysis_raw)
+        pipeline.add_stage("use_cases", use_cases, depends_on=["company_analysis_raw", "competitor_analysis_raw"])
+        pipeline.add_stage("company_pdf", company_pdf, depends_on=["company_analysis_raw", "competitor_analysis_raw"])
+        pipeline.add_stage("use_cases_pdf", use_cases_pdf, depends_on=["use_cases"])
+
+        if compare:
+            # Competitor sites are crawled while the target's own stages run
+            def competitor_sites():
+                return self._analyze_sites(self.get_competitor_sites(website_url)[:max_competitors], incremental)
+
+            def comparison_pdf(company_analysis_raw, competitor_sites):
+                target = {"url": website_url, "domain": competitor_key(website_url),
+                          "company_analysis": self.parse_company_analysis(company_analysis_raw)}
+                pdf_bytes, _ = self.report_renderer.render("create_comparison_pdf", [target] + competitor_sites)
+                return pdf_bytes
+
+            pipeline.add_stage("competitor_sites", competitor_sites)
+            pipeline.add_stage("comparison_pdf", comparison_pdf, depends_on=["company_analysis_raw", "competitor_sites"])
+
+        with self._traced("analyze_and_generate_pdfs", website_url, trace), self._refresh(refresh):
+            results = pipeline.run(on_stage=on_stage, cancel_event=cancel_event)
+
+        use_cases_data, use_case_links = results["use_cases"]
+        self._save_results(
+            website_url, "analyze_and_generate_pdfs",
+            self.parse_company_analysis(results["company_analysis_raw"]),
+            self.parse_competitor_analysis(results["competitor_analysis_raw"]),
+            use_cases_data, use_case_links
+        )
+
+        # Report file name -> PDF bytes; nothing is written to disk
+        reports = {
+            "company_analysis.pdf": results["company_pdf"],
+            "use_cases.pdf": results["use_cases_pdf"]
+        }
+        if compare:
+            reports["comparison.pdf"] = results["comparison_pdf"]
+        return reports
+
+    def get_competitor_sites(self, website_url):
+        return competitor_discovery.get_sites(self.tavily_client, website_url)
+
+    def _analyze_site(self, url, incremental=True):
+        """Crawl one site's footer pages and summarize the company, as a column of the comparison report."""
+        url = url if "://" in url else f"https://{url}"
+        site = {"url": url, "domain": competitor_key(url)}
+        with tracing.span(f"site:{site['domain']}", stage="compare_site"):
+            footer_content = self.get_footer_context(url)
+            if not footer_content or footer_content.startswith("Error fetching footer content"):
+                site["error"] = footer_content or "No footer found"
+                return site
+            prompt = self._generate_company_analysis_prompt(footer_content, url)
+            try:
+                raw = self._generate(url, "compare:company_analysis", "company_analysis", prompt, incremental)
+            except Exception as e:
+                # One unreachable competitor should not sink the whole comparison
+                site["error"] = f"Analysis failed: {str(e)}"
+                return site
+        site["company_analysis"] = self.parse_company_analysis(raw)
+        return site
+
+    def _analyze_sites(self, urls, incremental=True):
+        # All sites share the crawler's connection pool, page cache and in-flight request budget
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._analyze_site, url, incremental) for url in urls]
+            return [future.result() for future in futures]
+
+    def compare_websites(self, website_url, competitor_urls=None, max_competitors=5, refresh=False, trace=None,
+                         incremental=True):
+        """Crawl and summarize the site and its competitors' own websites side by side.
+
+        The target's crawl starts at once and the competitors' as soon as their
+        sites are known (``competitor_urls`` skips the lookup), so the total
+        time follows the slowest site rather than the sum of all of them.
+        Returns the per-site results and the comparison report.
+        """
+        with self._traced("compare_websites", website_url, trace), self._refresh(refresh):
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                target = pool.submit(contextvars.copy_context().run, self._analyze_site, website_url, incremental)
+                if competitor_urls is None:
+                    competitor_urls = self.get_competitor_sites(website_url)
+                competitors = self._analyze_sites(competitor_urls[:max_competitors], incremental)
+                sites = [target.result()] + competitors
+            pdf_bytes, _ = self.report_renderer.render("create_comparison_pdf", sites)
+        return {"sites": sites, "comparison.pdf": pdf_bytes}
+
+    def stream_use_cases(self, company_analysis, competitors):
+        """Yield ``(use_case, links_future)`` pairs as the use-case response streams in.
+
+        Each use case is yielded as soon as its Keywords line arrives, with its
+        dataset lookup already running; lookups for near-identical keyword sets
+        share one Serper query.
+        """
+        parser = JSONUseCaseStreamParser() if self.json_output else UseCaseStreamParser()
+        prompt = self._generate_use_cases_prompt(company_analysis, competitors)
+
+        with ThreadPoolExecutor(max_workers=self.dataset_searcher.max_workers) as pool:
+            batch = self.dataset_searcher.batch(pool)
+            for chunk in self.models.stream("use_cases", prompt):
+                for use_case in parser.feed(chunk.content):
+                    yield use_case, batch.submit(use_case.get('keywords', ''))
+            for use_case in parser.finish():
+                yield use_case, batch.submit(use_case.get('keywords', ''))
+
+    def _get_use_case_links(self, keywords_by_use_case):
+        # Overlapping keyword sets share one Serper query; the rest run concurrently
+        return self.dataset_searcher.search_many(keywords_by_use_case)
+
+
+    def get_footer_pages(self, website_url):
+        response = self.crawler.fetch(website_url)
+        links = footer_links(response.content)
+        if links is None:
+            return None
+
+        # Only distinct same-site HTML pages are fetched, the most informative first,
+        # so the crawler's page cap skips the least useful ones
+        report = CrawlReport()
+        footer_urls = plan_footer_links(response.url, links, report)
+
+        # Footer pages are fetched concurrently; failures are kept inline per URL
+        footer_content = self.crawler.crawl(footer_urls, report)
+        logger.info("%s: %s", website_url, report.summary())
+        # Per-URL skip reasons and extraction stats go on the stage's span in the trace
+        tracing.annotate(crawl=report.to_dict())
+        return footer_content
+
+    def get_footer_content(self, website_url):
+        try:
+            footer_content = self.get_footer_pages(website_url)
+            if footer_content is None:
+                return None
+            self._track_pages(website_url, footer_content)
             return self._combine_footer_content(footer_content)
         except Exception as e:
             return f"Error fetching footer content: {str(e)}"
 
+    def get_footer_context(self, website_url):
+        # Like get_footer_content, but keeps only the passages relevant to the analysis prompt
+        if self.context_selector is None:
+            return self.get_footer_content(website_url)
+        try:
+            footer_content = self.get_footer_pages(website_url)
+            if footer_content is None:
+                return None
+            self._track_pages(website_url, footer_content)
+            return self.context_selector.build_context(footer_content)
+        except Exception as e:
+            return f"Error fetching footer content: {str(e)}"
+
     def _combine_footer_content(self, footer_content):
         combined_content = ""
         for url, content in footer_content.items():
@@ -450,43 +910,29 @@ class WebsiteAnalyzer:
         return combined_content
 
     def get_competitors(self, website):
-        answer = self.tavily_client.qna_search(query=f"List 5 competitors to {website} in an array")
-        try:
-            return ast.literal_eval(answer)
-        except Exception as e:
-            print(f"Error parsing competitors: {e}")
-            return []
+        return competitor_discovery.get(self.tavily_client, website)
 
     def get_dataset_links(self, keywords):
-        url = "https://google.serper.dev/search"
-        payload = json.dumps({
-            "q": f"provide kaggle/hugging face datasets related to topic {keywords}",
-            "gl": "in"
-        })
-        headers = {
-            'X-API-KEY': self.serper_api_key,
-            'Content-Type': 'application/json'
-        }
+        return self.dataset_searcher.search(keywords)
 
-        try:
-            response = requests.post(url, headers=headers, data=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            links = {"github_links": [], "kaggle_links": [], "huggingface_links": []}
-            for result in data.get('organic', []):
-                if 'github.com' in result['link']:
-                    links["github_links"].append(result['link'])
-                elif 'kaggle.com' in result['link']:
-                    links["kaggle_links"].append(result['link'])
-                elif 'huggingface.co' in result['link']:
-                    links["huggingface_links"].append(result['link'])
-            return links
-        except Exception as e:
-            print(f"Error fetching dataset links: {e}")
-            return {"github_links": [], "kaggle_links": [], "huggingface_links": []}
+    def parse_company_analysis(self, text):
+        if self.json_output:
+            return structured_output.parse_company_analysis(text)
+        return TextCleaner.clean_company_analysis(text)
+
+    def parse_competitor_analysis(self, text):
+        if self.json_output:
+            return structured_output.parse_competitor_analysis(text)
+        return TextCleaner.clean_competitor_analysis(text)
+
+    def parse_use_cases(self, text):
+        if self.json_output:
+            return structured_output.parse_use_cases(text)
+        return TextCleaner.clean_markdown(text)
 
     def extract_use_cases(self, response_text):
+        if self.json_output:
+            return structured_output.use_case_keywords(structured_output.parse_use_cases(response_text))
         use_case_keywords = {}
         matches = re.findall(
             r'\*\*Use Case \d+: (.*?)\*\*.*?\*\*Keywords:\*\* (.*?)\n',
@@ -499,36 +945,53 @@ class WebsiteAnalyzer:
             use_case_keywords[use_case] = keywords
         return use_case_keywords
 
-    def analyze_website(self, website_url):
+    def analyze_website(self, website_url, refresh=False, trace=None, incremental=True):
+        pipeline = StagePipeline()
+
         # Step 1: Get website footer content
-        footer_content = self.get_footer_content(website_url)
-        
-        # Step 2: Get competitors
-        competitors_analysis_prompt = self.get_competitor_analysis(website_url)
-        competitors_analysis = self.llm.invoke(competitors_analysis_prompt)
-        competitors = self.get_competitors(website_url)
-        
+        pipeline.add_stage("footer_content", lambda: self.get_footer_context(website_url))
+
+        # Step 2: Get competitors (independent of the crawl)
+        pipeline.add_stage("competitors", lambda: self.get_competitors(website_url))
+        def competitors_analysis(competitors):
+            prompt = self._generate_competitor_analysis_prompt(competitors)
+            return self._generate(website_url, "competitor_analysis", "competitor_analysis", prompt, incremental)
+
         # Step 3: Generate company analysis
-        company_analysis_prompt = self._generate_company_analysis_prompt(footer_content, competitors)
-        company_analysis = self.llm.invoke(company_analysis_prompt)
-        
+        def company_analysis(footer_content, competitors):
+            company_analysis_prompt = self._generate_company_analysis_prompt(footer_content, competitors)
+            return self._generate(website_url, "company_analysis", "company_analysis", company_analysis_prompt,
+                                  incremental)
+
         # Step 4: Generate use cases
-        use_cases_prompt = self._generate_use_cases_prompt(company_analysis.content,competitors_analysis)
-        use_cases_response = self.llm.invoke(use_cases_prompt)
-        
+        def use_cases(company_analysis, competitors_analysis):
+            use_cases_prompt = self._generate_use_cases_prompt(company_analysis, competitors_analysis)
+            return self._generate(website_url, "use_cases", "use_cases", use_cases_prompt, incremental)
+
         # Step 5: Extract use cases and get dataset links
-        use_case_keywords = self.extract_use_cases(use_cases_response.content)
-        use_case_links = {}
-        
-        for use_case, keywords in use_case_keywords.items():
-            keywords_str = " ".join(keywords)
-            dataset_links = self.get_dataset_links(keywords_str)
-            use_case_links[use_case] = dataset_links
-        
+        def dataset_links(use_cases):
+            keywords = self.extract_use_cases(use_cases)
+            return self._incremental(website_url, "dataset_links", keywords,
+                                     lambda: self._get_use_case_links(keywords), incremental)
+
+        pipeline.add_stage("competitors_analysis", competitors_analysis, depends_on=["competitors"])
+        pipeline.add_stage("company_analysis", company_analysis, depends_on=["footer_content", "competitors"])
+        pipeline.add_stage("use_cases", use_cases, depends_on=["company_analysis", "competitors_analysis"])
+        pipeline.add_stage("dataset_links", dataset_links, depends_on=["use_cases"])
+        with self._traced("analyze_website", website_url, trace), self._refresh(refresh):
+            results = pipeline.run()
+
+        self._save_results(
+            website_url, "analyze_website",
+            self.parse_company_analysis(results["company_analysis"]),
+            self.parse_competitor_analysis(results["competitors_analysis"]),
+            self.parse_use_cases(results["use_cases"]), results["dataset_links"]
+        )
+
         return {
-            "company_analysis": company_analysis.content,
-            "use_cases": use_cases_response.content,
-            "dataset_links": use_case_links
+            "company_analysis": results["company_analysis"],
+            "use_cases": results["use_cases"],
+            "dataset_links": results["dataset_links"]
         }
 
     def _generate_company_analysis_prompt(self, footer_content, website_url):
@@ -545,7 +1008,7 @@ class WebsiteAnalyzer:
         3. Vision and goals
         4. Industry and market segment
 
-
+{self._output_format(COMPANY_ANALYSIS_SCHEMA)}
         """
 
     def _generate_use_cases_prompt(self, company_analysis, competitors):
@@ -558,26 +1021,33 @@ class WebsiteAnalyzer:
         Competitors:
         {competitors}
         
-        Format each use case as follows:
+        {self._use_case_format()}
+        """
+
+    def _output_format(self, schema):
+        # Empty in the default mode so the markdown prompts (and their cache keys) stay unchanged
+        return f"\n\n{structured_output.json_instructions(schema)}" if self.json_output else ""
+
+    def _use_case_format(self):
+        if self.json_output:
+            return structured_output.json_instructions(USE_CASE_SCHEMA, many=True)
+        return """Format each use case as follows:
         **Use Case X: [Title]**
         Objective: [Description]
         AI Application: [Details]
         Cross-Functional Benefits:
         - [Benefit 1]
         - [Benefit 2]
-        **Keywords:** [keyword1], [keyword2], [keyword3]
-        """
+        **Keywords:** [keyword1], [keyword2], [keyword3]"""
 
 
     def get_competitor_analysis(self, website_url):
-        try:
-            answer = self.tavily_client.qna_search(query=f"List 5 competitors to {website_url} in an array")
-            competitor_names = ast.literal_eval(answer)
-        except Exception as e:
-            print("Error in parsing the competitor data:", e)
-            competitor_names = []
+        competitor_names = self.get_competitors(website_url)
+        response = self.models.invoke("competitor_analysis", self._generate_competitor_analysis_prompt(competitor_names))
+        return competitor_names, response.content
 
-        prompt = f"""
+    def _generate_competitor_analysis_prompt(self, competitor_names):
+        return f"""
         List down company-wise their products and services offered in detail.
         Competitors: {competitor_names}
 
@@ -585,7 +1055,5 @@ class WebsiteAnalyzer:
         1. Overview of market trends in AI.
         2. Drivers and challenges in the AI landscape.
         3. Market forecasts and growth potential.
-        4. Industry-specific reports from McKinsey or Deloitte.(if not found then leave)
+        4. Industry-specific reports from McKinsey or Deloitte.(if not found then leave){self._output_format(COMPETITOR_ANALYSIS_SCHEMA)}
         """
-        response = self.llm.invoke(prompt)
-        return competitor_names, response.content